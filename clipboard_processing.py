@@ -1,12 +1,15 @@
 # clipboard_processing.py
 import base64
+import hashlib
 import io
 import asyncio
 import logging
+import sys
+import threading
 import time
 from typing import Optional, Dict, Any, Tuple
 from functools import lru_cache
-from collections import deque
+from collections import OrderedDict, deque
 import clipman
 from ocr import is_question_with_image, ocr_image, extract_question_from_ocr
 from question_processing import (get_answer_with_context, get_answer_without_context,
@@ -16,6 +19,45 @@ from platform_interface import IconState
 from license_manager import LicenseManager
 import re
 
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _user32.OpenClipboard.argtypes = [wintypes.HWND]
+    _user32.GetClipboardData.argtypes = [wintypes.UINT]
+    _user32.GetClipboardData.restype = wintypes.HANDLE
+    _kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    _kernel32.GlobalLock.restype = wintypes.LPVOID
+    _kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    _CF_UNICODETEXT = 13
+
+    # Windows bumps this counter on every clipboard write, so an unchanged value means
+    # there is nothing new to paste; 0 means it isn't available to this process
+    _get_clipboard_sequence = _user32.GetClipboardSequenceNumber
+
+    def _paste_text() -> Optional[str]:
+        """Read the clipboard's text straight from Win32, using clipman if it is busy."""
+        if not _user32.OpenClipboard(None):
+            return clipman.paste()
+        try:
+            handle = _user32.GetClipboardData(_CF_UNICODETEXT)
+            if not handle:
+                return ''  # No text on the clipboard
+            pointer = _kernel32.GlobalLock(handle)
+            if not pointer:
+                return ''
+            try:
+                return ctypes.wstring_at(pointer)
+            finally:
+                _kernel32.GlobalUnlock(handle)
+        finally:
+            _user32.CloseClipboard()
+else:
+    _get_clipboard_sequence = None
+    _paste_text = clipman.paste
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,8 +69,106 @@ logging.getLogger('urllib3').setLevel(logging.WARNING)
 logging.getLogger('keyring').setLevel(logging.WARNING)
 logging.getLogger('license_manager').setLevel(logging.INFO)
 
+class _Win32ClipboardListener:
+    """Call on_change on every WM_CLIPBOARDUPDATE, using a hidden message-only window.
+
+    The window and its message loop live on a daemon thread, so on_change is
+    called from that thread.
+    """
+    WM_CLOSE = 0x0010
+    WM_DESTROY = 0x0002
+    WM_CLIPBOARDUPDATE = 0x031D
+    CLASS_NAME = "ClipbrdClipboardListener"
+
+    def __init__(self, on_change):
+        self._on_change = on_change
+        self._hwnd = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="clipboard-listener")
+
+    def start(self) -> bool:
+        """Start listening; returns False if the listener window could not be set up."""
+        self._thread.start()
+        self._ready.wait(timeout=2)
+        return self._hwnd is not None
+
+    def stop(self) -> None:
+        if self._hwnd is not None:
+            self._user32.PostMessageW(self._hwnd, self.WM_CLOSE, 0, 0)
+
+    def _run(self) -> None:
+        import ctypes
+        from ctypes import wintypes
+
+        try:
+            # Private DLL handles so the argtypes set here don't leak into other ctypes users
+            user32 = ctypes.WinDLL('user32', use_last_error=True)
+            kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+            self._user32 = user32
+            LRESULT = ctypes.c_ssize_t
+            WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+
+            class WNDCLASSW(ctypes.Structure):
+                _fields_ = [('style', wintypes.UINT), ('lpfnWndProc', WNDPROC),
+                            ('cbClsExtra', ctypes.c_int), ('cbWndExtra', ctypes.c_int),
+                            ('hInstance', wintypes.HINSTANCE), ('hIcon', wintypes.HICON),
+                            ('hCursor', wintypes.HANDLE), ('hbrBackground', wintypes.HBRUSH),
+                            ('lpszMenuName', wintypes.LPCWSTR), ('lpszClassName', wintypes.LPCWSTR)]
+
+            kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+            user32.DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+            user32.DefWindowProcW.restype = LRESULT
+            user32.CreateWindowExW.argtypes = [wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+                                               ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                               wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID]
+            user32.CreateWindowExW.restype = wintypes.HWND
+            user32.PostMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+
+            def wndproc(hwnd, msg, wparam, lparam):
+                if msg == self.WM_CLIPBOARDUPDATE:
+                    try:
+                        self._on_change()
+                    except Exception as e:
+                        logger.error(f"Error handling clipboard update: {e}")
+                    return 0
+                if msg == self.WM_CLOSE:
+                    user32.RemoveClipboardFormatListener(hwnd)
+                    user32.DestroyWindow(hwnd)
+                    return 0
+                if msg == self.WM_DESTROY:
+                    user32.PostQuitMessage(0)
+                    return 0
+                return user32.DefWindowProcW(hwnd, msg, wparam, lparam)
+
+            # Keep the callback alive for as long as the window exists
+            self._wndproc = WNDPROC(wndproc)
+            hinstance = kernel32.GetModuleHandleW(None)
+            wndclass = WNDCLASSW(lpfnWndProc=self._wndproc, hInstance=hinstance, lpszClassName=self.CLASS_NAME)
+            user32.RegisterClassW(ctypes.byref(wndclass))
+
+            HWND_MESSAGE = wintypes.HWND(-3)
+            hwnd = user32.CreateWindowExW(0, self.CLASS_NAME, self.CLASS_NAME, 0, 0, 0, 0, 0,
+                                          HWND_MESSAGE, None, hinstance, None)
+            if not hwnd or not user32.AddClipboardFormatListener(hwnd):
+                raise ctypes.WinError(ctypes.get_last_error())
+            self._hwnd = hwnd
+        except Exception as e:
+            logger.error(f"Failed to start clipboard listener: {e}")
+            return
+        finally:
+            self._ready.set()
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        self._hwnd = None
+
 class ClipboardProcessor:
     DEFAULT_POLLING_INTERVAL = 1  # Default polling interval in seconds
+    ANSWER_CACHE_SIZE = 128  # Recently answered questions kept for repeat copies
+    # With change notifications, still re-check this often in case one is missed
+    LISTENER_FALLBACK_INTERVAL = 30
     
     def __init__(self, cache_size: int = 1000):
         self.clipboard_cache = deque(maxlen=cache_size)
@@ -38,7 +178,7 @@ class ClipboardProcessor:
         self._setup_caches()
         self._initial_content = None
         self.last_processed_content = None
-        self.screenshot = None  # Store the latest screenshot
+        self.screenshot = None  # Latest screenshot as (base64 data, mime type)
         self.logger = logging.getLogger('ClipboardProcessor')
         self.search = None
         self.inverted_index = None
@@ -46,6 +186,14 @@ class ClipboardProcessor:
         self.platform = None
         self.last_content = None
         self.processing = False
+        # Screenshots are tracked separately so OCR and LLM calls don't stall clipboard polling
+        self.screenshot_processing = False
+        # Windows clipboard change notifications: None until first used, False if unavailable
+        self._clipboard_listener = None
+        self._clipboard_changed = asyncio.Event()
+        self._last_clipboard_seq = None
+        # Digest of normalized question -> (is_mcq, answer), oldest first
+        self._answer_cache = OrderedDict()
         # Initialize immediately in constructor
         self.initialize()
         logger.info("ClipboardProcessor initialized")
@@ -96,10 +244,35 @@ class ClipboardProcessor:
     def cleanup(self):
         """Cleanup resources."""
         try:
-            pass
+            if self._clipboard_listener:
+                self._clipboard_listener.stop()
         except Exception as e:
             logger.error(f"Error during clipboard cleanup: {e}")
 
+    def _start_clipboard_listener(self) -> None:
+        """Subscribe to clipboard change notifications where the platform offers them."""
+        self._clipboard_listener = False
+        if sys.platform != 'win32':
+            return
+        loop = asyncio.get_running_loop()
+        listener = _Win32ClipboardListener(lambda: loop.call_soon_threadsafe(self._clipboard_changed.set))
+        if listener.start():
+            self._clipboard_listener = listener
+            logger.info("Listening for clipboard change notifications")
+
+    async def wait_for_change(self, poll_interval: float) -> None:
+        """Wait until the clipboard changes, or poll_interval seconds where that can't be observed."""
+        if self._clipboard_listener is None:
+            self._start_clipboard_listener()
+        if not self._clipboard_listener:
+            await asyncio.sleep(poll_interval)
+            return
+        try:
+            await asyncio.wait_for(self._clipboard_changed.wait(), self.LISTENER_FALLBACK_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        self._clipboard_changed.clear()
+
     async def get_content(self) -> Optional[str]:
         """Get content from clipboard."""
         try:
@@ -180,7 +353,14 @@ class ClipboardProcessor:
                 await asyncio.sleep(self.rate_limit_delay - time_since_last)
 
             async with self.processing_lock:
-                current_clipboard = clipman.paste()
+                # Skip the paste entirely while the clipboard hasn't been written to
+                if _get_clipboard_sequence is not None:
+                    seq = _get_clipboard_sequence()
+                    if seq and seq == self._last_clipboard_seq:
+                        return
+                    self._last_clipboard_seq = seq
+
+                current_clipboard = _paste_text()
                 
                 # Quick validation checks
                 if not current_clipboard:
@@ -192,6 +372,15 @@ class ClipboardProcessor:
                     return
                 
                 normalized_clipboard = self.cached_normalize(current_clipboard)
+
+                # A question answered recently gets its answer again without any LLM calls
+                answer_key = hashlib.blake2b(normalized_clipboard.encode('utf-8'), digest_size=16).digest()
+                cached_answer = self._answer_cache.get(answer_key)
+                if cached_answer is not None:
+                    self._answer_cache.move_to_end(answer_key)
+                    app.debug_info.append("Answer found in cache")
+                    self._replay_answer(app, current_clipboard, *cached_answer)
+                    return
                 
                 # Cache check
                 if normalized_clipboard in self.clipboard_cache:
@@ -206,6 +395,8 @@ class ClipboardProcessor:
                 # Validate app has required attributes before processing
                 if not self._validate_app_requirements(app):
                     app.debug_info.append("App not ready for processing")
+                    # Forget the sequence number so this content is retried once the app is ready
+                    self._last_clipboard_seq = None
                     return
 
                 # Log new content detected
@@ -220,15 +411,22 @@ class ClipboardProcessor:
                 # Process content
                 app.update_icon(IconState.WORKING)
                 logger.info("Processing clipboard content")
+
+                # Ambiguous texts are classified and expanded into search terms in one
+                # LLM call; search_for_context picks the terms up from the cache
                 is_mcq, clipboard = await self._process_question(current_clipboard, app)
                 app.debug_info.append(f"MCQ detected: {is_mcq}")
 
                 if is_mcq:
                     logger.info("Processing MCQ question")
-                    await self._process_mcq(app, clipboard)
+                    answer = await self._process_mcq(app, clipboard)
                 else:
                     logger.info("Processing non-MCQ question")
-                    await self._process_non_mcq(app, current_clipboard)
+                    answer = await self._process_non_mcq(app, current_clipboard)
+                if answer:
+                    self._answer_cache[answer_key] = (is_mcq, answer)
+                    if len(self._answer_cache) > self.ANSWER_CACHE_SIZE:
+                        self._answer_cache.popitem(last=False)
 
                 self.last_process_time = time.time()
 
@@ -238,13 +436,34 @@ class ClipboardProcessor:
         except Exception as e:
             logger.error(f"Error processing clipboard: {e}")
             app.update_icon(IconState.ERROR)
+            self._last_clipboard_seq = None
         finally:
             self.processing = False
 
+    def _replay_answer(self, app, question: str, is_mcq: bool, answer: str) -> None:
+        """Show a cached answer the same way a freshly computed one is shown."""
+        logger.info("Reusing cached answer for repeated question")
+        if is_mcq:
+            self.last_processed_content = question
+            app.last_clipboard = question
+            app.update_icon(IconState.MCQ_ANSWER, text=answer)
+        else:
+            app.question_clipboard = answer
+            self.last_processed_content = answer
+            clipman.copy(answer)
+            app.update_icon(IconState.SUCCESS)
+
     async def _process_question(self, text: str, app) -> tuple[bool, str]:
         """Process question with caching."""
         try:
-            return await is_formatted_question(text, app.llm_router)
+            is_mcq, clipboard, was_modified = await is_formatted_question(
+                text, app.llm_router, expand_terms=self._has_context_components()
+            )
+            # Write the renumbered MCQ back only when detection actually changed it;
+            # copying unchanged text would just re-trigger our own clipboard watcher
+            if was_modified:
+                clipman.copy(clipboard)
+            return is_mcq, clipboard
         except Exception as e:
             logger.error(f"Error processing question: {e}")
             return False, text
@@ -255,11 +474,14 @@ class ClipboardProcessor:
             self.logger.warning("No screenshot data to process")
             return
 
-        if self.processing:
+        if self.screenshot_processing:
             self.logger.warning("Screenshot processing already in progress")
             return
 
-        self.processing = True
+        self.screenshot_processing = True
+        # Work on this capture even if a newer one is stored while we await
+        pending = self.screenshot
+        screenshot, mime_type = pending
         try:
             app.update_icon(IconState.WORKING)
             self.logger.info("Starting screenshot processing")
@@ -267,15 +489,15 @@ class ClipboardProcessor:
 
             # Check if it's a question with an image
             self.logger.info("Checking if screenshot contains a question with image")
-            has_image = await is_question_with_image(self.screenshot, app.llm_router)
+            has_image = await is_question_with_image(screenshot, app.llm_router)
             self.logger.info(f"Image detection result: {has_image}")
 
             if has_image:
                 self.logger.info("Question with image detected")
-                await self._process_image_question(app, self.screenshot)
+                await self._process_image_question(app, screenshot, mime_type)
             else:
                 self.logger.info("Extracting question from OCR text")
-                question = await extract_question_from_ocr(self.screenshot, app.llm_router)
+                question = await extract_question_from_ocr(screenshot, app.llm_router, mime_type)
                 if question:
                     self.logger.info("Question extracted successfully")
                     app.debug_info.append(f"Extracted question: {question[:200]}")
@@ -332,21 +554,22 @@ class ClipboardProcessor:
             app.update_icon(IconState.IDLE)
             self.logger.info("Screenshot processing completed with errors")
         finally:
-            self.processing = False
-            self.screenshot = None  # Clear the screenshot after processing
+            self.screenshot_processing = False
+            if self.screenshot is pending:
+                self.screenshot = None  # Clear the screenshot after processing
             self.logger.debug("Screenshot processing resources cleaned up")
 
-    def set_screenshot(self, screenshot_data: str) -> None:
+    def set_screenshot(self, screenshot_data: str, mime_type: str = 'image/png') -> None:
         """Set screenshot data for processing."""
-        self.screenshot = screenshot_data
+        self.screenshot = (screenshot_data, mime_type)
         self.logger.debug("Screenshot data set for processing")
 
-    async def _process_image_question(self, app, base64_image: str) -> None:
+    async def _process_image_question(self, app, base64_image: str, mime_type: str = 'image/png') -> None:
         """Process image-based question with error handling."""
         try:
             app.debug_info.append("Processing question with image")
             image_data = {
-                "url": f"data:image/png;base64,{base64_image}",
+                "url": f"data:{mime_type};base64,{base64_image}",
                 "detail": "high"
             }
             
@@ -362,10 +585,10 @@ class ClipboardProcessor:
             logger.error(f"Error processing image question: {e}")
             app.update_icon("Clipbrd: Error")
 
-    async def _process_text_from_image(self, app, base64_image: str) -> None:
+    async def _process_text_from_image(self, app, base64_image: str, mime_type: str = 'image/png') -> None:
         """Process text extracted from image with error handling."""
         try:
-            base64_image_url = f"data:image/png;base64,{base64_image}"
+            base64_image_url = f"data:{mime_type};base64,{base64_image}"
             
             # Try direct OCR first
             logger.info("Attempting direct OCR")
@@ -400,8 +623,8 @@ class ClipboardProcessor:
             app.update_icon(IconState.ERROR)
             app.debug_info.append(f"Screenshot processing error: {str(e)}")
 
-    async def _process_mcq(self, app, text: str) -> None:
-        """Process MCQ with error handling and caching."""
+    async def _process_mcq(self, app, text: str) -> Optional[str]:
+        """Process MCQ with error handling and caching; returns the answer shown, if any."""
         try:
             logger.info(f"Starting MCQ processing with text length: {len(text)}")
             logger.info(f"MCQ text content: {text[:500]}...")
@@ -457,6 +680,7 @@ class ClipboardProcessor:
                 app.update_icon(IconState.MCQ_ANSWER, text=answer_number)
                 app.debug_info.append(f"MCQ answer: {answer_number}")
                 app.last_clipboard = text
+                return answer_number
             else:
                 logger.error("Failed to get MCQ answer")
                 app.update_icon(IconState.ERROR)
@@ -469,8 +693,8 @@ class ClipboardProcessor:
             await asyncio.sleep(2)
             app.update_icon(IconState.IDLE)
 
-    async def _process_non_mcq(self, app, text: str) -> None:
-        """Process non-MCQ with error handling and caching."""
+    async def _process_non_mcq(self, app, text: str) -> Optional[str]:
+        """Process non-MCQ with error handling and caching; returns the answer copied, if any."""
         try:
             app.update_icon(IconState.WORKING)
             # Try with context first
@@ -496,6 +720,7 @@ class ClipboardProcessor:
                 app.update_icon(IconState.SUCCESS)
                 app.debug_info.append(f"Answer: {answer}")
                 logger.info("Non-MCQ processed successfully")
+                return answer
             else:
                 app.update_icon(IconState.ERROR)
                 logger.error("Failed to get answer: answer is None")
@@ -3,6 +3,7 @@ import os
 import sys
 import asyncio
 import logging
+from collections import deque
 from typing import Dict, Callable, Optional
 from dotenv import load_dotenv
 
@@ -13,6 +14,8 @@ from clipboard_processing import ClipboardProcessor
 from license_manager import LicenseManager
 from llmrouter import LLMRouter
 from document_processing import process_documents
+from question_processing import (load_mcq_cache, save_mcq_cache,
+                                 load_related_terms_cache, save_related_terms_cache)
 from screenshot import ScreenshotManager, ScreenshotConfig, ScreenshotType
 
 # Load environment variables
@@ -29,6 +32,10 @@ class MockClipboardProcessor:
         await asyncio.sleep(1)
         return None
 
+    async def wait_for_change(self, poll_interval: float) -> None:
+        """Mock wait that just sleeps."""
+        await asyncio.sleep(poll_interval)
+
     def cleanup(self):
         """Mock cleanup."""
         pass
@@ -41,12 +48,14 @@ class MockClipboardProcessor:
 class Clipbrd:
     # Class constants
     DEFAULT_POLLING_INTERVAL = 1  # Default polling interval in seconds
+    DEBUG_INFO_MAX_ENTRIES = 500  # Entries kept in debug_info
 
     def __init__(self):
         self.settings = SettingsManager()
         self.platform = None
         self.running = False
-        self.debug_info = []
+        # Recent processing notes only; the full history is in debug.log
+        self.debug_info = deque(maxlen=self.DEBUG_INFO_MAX_ENTRIES)
         self.setup_logging()
         # Initialize required attributes
         self.llm_router = None
@@ -55,6 +64,8 @@ class Clipbrd:
         self.documents = None
         # Initialize clipboard processor after license check
         self.clipboard = None
+        # Set once the persisted LLM caches are loaded, so cleanup only writes back what it read
+        self._caches_loaded = False
     
     def setup_logging(self):
         logging.basicConfig(
@@ -104,6 +115,11 @@ class Clipbrd:
                 self.running = True
                 return True
 
+            # Restore classifier verdicts and search terms from the previous session
+            load_mcq_cache()
+            load_related_terms_cache()
+            self._caches_loaded = True
+
             # Initialize LLM Router with API keys from environment
             self.llm_router = LLMRouter(
                 anthropic_api_key=os.getenv('ANTHROPIC_API_KEY'),
@@ -214,7 +230,8 @@ class Clipbrd:
             while self.running:
                 try:
                     await self.clipboard.process_clipboard(self)
-                    await asyncio.sleep(self.DEFAULT_POLLING_INTERVAL)
+                    # Wakes on clipboard change notifications where available, else polls
+                    await self.clipboard.wait_for_change(self.DEFAULT_POLLING_INTERVAL)
                 except Exception as e:
                     self.logger.error(f"Error in clipboard processing loop: {e}")
                     await asyncio.sleep(1)  # Wait before retrying
@@ -230,16 +247,27 @@ class Clipbrd:
                 self.platform.cleanup()
             if self.clipboard:
                 self.clipboard.cleanup()
+            if self.llm_router:
+                self.llm_router.close()
         except Exception as e:
             self.logger.error(f"Error during cleanup: {e}")
+        # Separate from the teardown above so a failing close can't skip the writes
+        try:
+            if self._caches_loaded:
+                save_mcq_cache()
+                save_related_terms_cache()
+        except Exception as e:
+            self.logger.error(f"Error saving caches: {e}")
     
     async def run(self):
         """Run the application."""
-        if not await self.initialize():
-            self.logger.error("Failed to initialize application")
-            return
-
         try:
+            # Inside the try so whatever a failed initialize already built (e.g. the
+            # router's connection pool) is still released by cleanup()
+            if not await self.initialize():
+                self.logger.error("Failed to initialize application")
+                return
+
             # Create an event to signal when the platform interface is ready
             platform_ready = asyncio.Event()
             
@@ -304,10 +332,10 @@ class Clipbrd:
         self.screenshot_manager = ScreenshotManager(config)
         
         # Set up callback for screenshot actions
-        def screenshot_callback(screenshot_type: ScreenshotType):
-            # Schedule the async handler in the event loop
+        def screenshot_callback(screenshot_type: ScreenshotType, screenshot_data: str):
+            # Schedule the async handler in the event loop with the already captured image
             asyncio.run_coroutine_threadsafe(
-                self.handle_screenshot(screenshot_type.name.lower()),
+                self.handle_screenshot(screenshot_type.name.lower(), screenshot_data),
                 self.main_loop
             )
         
@@ -319,8 +347,12 @@ class Clipbrd:
         else:
             self.logger.error("Failed to initialize screenshot manager")
 
-    async def handle_screenshot(self, screenshot_type: str):
-        """Handle screenshot capture request."""
+    async def handle_screenshot(self, screenshot_type: str, screenshot_data: Optional[str] = None):
+        """Handle screenshot capture request.
+
+        Hotkey captures arrive with screenshot_data already taken on the capture
+        worker; menu-triggered requests capture here, off the event loop.
+        """
         try:
             if not self.clipboard:
                 self.logger.error("Screenshot failed: Clipboard processor not initialized")
@@ -329,17 +361,19 @@ class Clipbrd:
             self.logger.info(f"Starting screenshot capture: type={screenshot_type}")
             self.update_icon(IconState.SCREENSHOT)
             
-            # Take screenshot using screenshot manager (now synchronous)
-            self.logger.debug("Invoking screenshot manager")
-            screenshot_data = self.screenshot_manager.take_screenshot(
-                getattr(ScreenshotType, screenshot_type.upper())
-            )
+            if screenshot_data is None:
+                # Take screenshot using screenshot manager in a worker thread
+                self.logger.debug("Invoking screenshot manager")
+                screenshot_data = await asyncio.to_thread(
+                    self.screenshot_manager.take_screenshot,
+                    getattr(ScreenshotType, screenshot_type.upper())
+                )
             
             if screenshot_data:
                 self.logger.info("Screenshot captured successfully")
                 self.logger.debug("Storing screenshot in clipboard processor")
                 # Store screenshot in clipboard processor
-                self.clipboard.set_screenshot(screenshot_data)
+                self.clipboard.set_screenshot(screenshot_data, self.screenshot_manager.config.mime_type)
                 
                 self.logger.info("Starting screenshot processing")
                 # Process screenshot (this will handle its own state management)
@@ -4,8 +4,6 @@ import subprocess
 import json
 import tempfile
 import shutil
-import tkinter as tk
-from tkinter import messagebox
 from pathlib import Path
 from typing import Dict, List, Optional
 import logging
@@ -40,6 +38,9 @@ class DependencyManager:
 
     def _show_libreoffice_install_dialog(self) -> bool:
         """Show a dialog prompting user to install LibreOffice."""
+        import tkinter as tk
+        from tkinter import messagebox
+
         root = tk.Tk()
         root.withdraw()  # Hide the main window
         
@@ -3,6 +3,7 @@ import os
 import asyncio
 import logging
 from typing import List, Dict, Union, Optional
+import httpx
 from anthropic import Anthropic
 from openai import OpenAI
 import google.generativeai as genai
@@ -19,16 +20,33 @@ class LLMRouter:
         deepinfra_api_key: str,
         gemini_api_key: str = None,
     ):
-        self.anthropic_client = Anthropic(api_key=anthropic_api_key)
-        self.openai_client = OpenAI(api_key=openai_api_key)
+        # One pooled HTTP client shared by the Anthropic, OpenAI and DeepInfra clients so their
+        # TLS connections are kept alive; Gemini goes through google.generativeai's own transport
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0
+            )
+        )
+        self.anthropic_client = Anthropic(api_key=anthropic_api_key, http_client=self.http_client)
+        self.openai_client = OpenAI(api_key=openai_api_key, http_client=self.http_client)
         self.deepinfra_client = OpenAI(
             api_key=deepinfra_api_key,
-            base_url='https://api.deepinfra.com/v1/openai'
+            base_url='https://api.deepinfra.com/v1/openai',
+            http_client=self.http_client
         )
         if gemini_api_key:
             genai.configure(api_key=gemini_api_key)
             self.gemini_model = genai.GenerativeModel('gemini-pro')
 
+    def close(self) -> None:
+        """Close the shared HTTP connection pool."""
+        try:
+            self.http_client.close()
+        except Exception as e:
+            logger.error(f"Error closing HTTP client: {e}")
+
     async def generate(
         self,
         model: str,
@@ -1,6 +1,8 @@
+import asyncio
 import base64
 import requests
 import io
+import json
 import uuid
 import os
 import logging
@@ -9,6 +11,9 @@ from PIL import Image
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Shared so repeated OCR calls and chunk uploads reuse the TLS connection
+_session = requests.Session()
+
 def split_image_into_chunks(image_data, chunk_size=1024*1024):
     """Split image data into chunks of specified size."""
     logger.debug(f"Splitting image of size {len(image_data)} bytes into chunks of {chunk_size} bytes")
@@ -43,7 +48,7 @@ def upload_image_chunks(image_data, lang='spa+eng'):
         }
         
         try:
-            response = requests.post(
+            response = _session.post(
                 f"{api_url}/ocr/upload-chunk", 
                 json=payload,
                 headers={'Content-Type': 'application/json'}
@@ -78,19 +83,19 @@ def ocr_image(base64_image, lang='spa+eng', mime_type='image/png'):
             logger.debug("Removing data URL header")
             base64_image = base64_image.split(',', 1)[1]
         
-        # Decode base64 to get raw image data
-        try:
-            logger.debug("Decoding base64 image data")
-            image_data = base64.b64decode(base64_image)
-        except Exception as e:
-            logger.error(f"Failed to decode base64 data: {e}", exc_info=True)
-            raise Exception(f"Invalid base64 data: {str(e)}")
-        
-        # Check file size
-        file_size = len(image_data)
+        # Check file size from the base64 length; only the chunked upload needs the raw bytes
+        file_size = len(base64_image) * 3 // 4 - base64_image[-2:].count('=')
         logger.info(f"Image size: {file_size/1024/1024:.2f}MB")
         
         if file_size > 5 * 1024 * 1024:  # 5MB
+            # Decode base64 to get raw image data
+            try:
+                logger.debug("Decoding base64 image data")
+                image_data = base64.b64decode(base64_image)
+            except Exception as e:
+                logger.error(f"Failed to decode base64 data: {e}", exc_info=True)
+                raise Exception(f"Invalid base64 data: {str(e)}")
+
             logger.info("Image exceeds 5MB, using chunked upload")
             return upload_image_chunks(image_data, lang)
         
@@ -98,16 +103,18 @@ def ocr_image(base64_image, lang='spa+eng', mime_type='image/png'):
         logger.info("Using direct upload for OCR")
         url = 'https://tess.joseluissaorin.com/ocr'
         
-        data = {
-            'image': f'data:{mime_type};base64,{base64_image}',
-            'lang': lang
-        }
+        # base64 never needs JSON escaping, so splice it into the body directly rather
+        # than have requests run json.dumps over the whole multi-megabyte string
+        body = ''.join((
+            '{"image": ', json.dumps(f'data:{mime_type};base64,')[:-1], base64_image,
+            '", "lang": ', json.dumps(lang), '}'
+        )).encode('ascii')
         
         logger.debug("Sending OCR request")
-        response = requests.post(
+        response = _session.post(
             url, 
             headers={'Content-Type': 'application/json'}, 
-            json=data
+            data=body
         )
         response.raise_for_status()
         
@@ -214,9 +221,9 @@ def extract_text_from_image(image_url, llm_router):
     generated_text = response
     return generated_text
 
-async def extract_question_from_ocr(image_url, llm_router):
-    # First, perform OCR on the image
-    ocr_text = ocr_image(base64_image=image_url)
+async def extract_question_from_ocr(image_url, llm_router, mime_type='image/png'):
+    # First, perform OCR on the image; the upload blocks, so keep it off the event loop
+    ocr_text = await asyncio.to_thread(ocr_image, base64_image=image_url, mime_type=mime_type)
 
     # Now, use LLM to extract and format the question from the OCR text
     messages = [
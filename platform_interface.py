@@ -10,8 +10,6 @@ import time
 import queue
 import threading
 import winsound
-from pynput import keyboard
-from screenshot import ScreenshotType
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +109,8 @@ class WindowsPlatform(PlatformInterface):
         self.pystray = pystray
         self.Image = Image
         self.icon = None
+        # Decoded IDLE icon, reused every time the tray returns to idle
+        self._idle_image = None
         self.icon_update_queue = queue.Queue()
         self._update_thread = None
         self._icon_states = {
@@ -154,7 +154,7 @@ class WindowsPlatform(PlatformInterface):
             self.main_loop = asyncio.get_event_loop()
             
             # Load the default icon for initialization
-            icon_image = self.Image.open(self.config.icon_path)
+            icon_image = self._load_idle_image()
             self.logger.debug(f"Loaded initial icon from {self.config.icon_path}")
             
             self.icon = self.pystray.Icon(
@@ -167,6 +167,9 @@ class WindowsPlatform(PlatformInterface):
             self.setup_menu()
             self.logger.debug("Menu setup complete")
             
+            # Render the state icons in the background so the first update doesn't wait on them
+            threading.Thread(target=self._prewarm_icons, daemon=True).start()
+
             # Start the update thread
             self._running = True  # Ensure _running is set before starting thread
             self._update_thread = threading.Thread(target=self._update_loop, daemon=True)
@@ -178,19 +181,38 @@ class WindowsPlatform(PlatformInterface):
             self.logger.error(f"Failed to initialize Windows platform: {e}", exc_info=True)
             return False
     
+    def _prewarm_icons(self) -> None:
+        """Render the emoji icon of every state once, filling the icon caches."""
+        try:
+            from utils import create_text_image
+            for content in self._icon_states.values():
+                if content and content != self.config.icon_path:
+                    create_text_image(content)
+        except Exception as e:
+            self.logger.error(f"Failed to prewarm icons: {e}")
+
+    def _load_idle_image(self):
+        """Decode the default icon file once and return the cached image."""
+        if self._idle_image is None:
+            icon_image = self.Image.open(self.config.icon_path)
+            icon_image.load()
+            self._idle_image = icon_image
+        return self._idle_image
+
     def _update_loop(self):
         """Background thread to process icon updates."""
         self.logger.info("Icon update loop started")
-        import time
         while self._running:
             try:
-                if not self.icon_update_queue.empty():
-                    state, text = self.icon_update_queue.get_nowait()
-                    self.logger.debug(f"Processing icon update: state={state}, text={text}")
-                    self._update_icon_image(state, text)
+                # Block until an update arrives; cleanup() queues None to wake us for shutdown
+                update = self.icon_update_queue.get()
+                if update is None:
+                    break
+                state, text = update
+                self.logger.debug(f"Processing icon update: state={state}, text={text}")
+                self._update_icon_image(state, text)
             except Exception as e:
                 self.logger.error(f"Error processing icon update: {e}", exc_info=True)
-            time.sleep(0.1)  # Check every 100ms
         self.logger.info("Icon update loop ended")
     
     def run(self) -> None:
@@ -228,9 +250,9 @@ class WindowsPlatform(PlatformInterface):
             from utils import create_text_image
             
             if state == IconState.IDLE:
-                # For IDLE state, always use the original icon file
+                # For IDLE state, always use the original icon, decoded once
                 self.logger.debug("Loading IDLE state icon")
-                icon_image = self.Image.open(self._icon_states[state])
+                icon_image = self._load_idle_image()
             elif state == IconState.MCQ_ANSWER and text:
                 # For MCQ answers, create image directly from the answer text
                 self.logger.debug(f"Creating MCQ answer image with text: {text}")
@@ -408,26 +430,12 @@ class WindowsPlatform(PlatformInterface):
             await asyncio.sleep(2)
             self.update_icon(IconState.IDLE)
     
-    def _setup_shortcut(self, shortcut_key: str, screenshot_type: ScreenshotType) -> None:
-        """Setup a single keyboard shortcut."""
-        try:
-            def on_activate():
-                # Create task in the event loop
-                loop = asyncio.get_event_loop()
-                loop.create_task(self._handle_screenshot(screenshot_type))
-
-            hotkey = keyboard.GlobalHotKeys({shortcut_key: on_activate})
-            hotkey.start()
-            self.hotkey_listeners[shortcut_key] = hotkey
-            logger.debug(f"Shortcut {shortcut_key} set up for {screenshot_type.name}")
-        except Exception as e:
-            logger.error(f"Error setting up shortcut {shortcut_key}: {e}")
-    
     def cleanup(self) -> None:
         """Cleanup Windows resources."""
         try:
             self.logger.info("Starting Windows platform cleanup")
             self._running = False
+            self.icon_update_queue.put(None)
             if self._update_thread and self._update_thread.is_alive():
                 self.logger.debug("Waiting for update thread to finish")
                 self._update_thread.join(timeout=1.0)
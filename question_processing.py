@@ -1,329 +1,326 @@
 import re
-import clipman
+import json
 import asyncio
+import hashlib
+import heapq
 import logging
+from collections import OrderedDict
+from pathlib import Path
 from document_processing import _normalize_and_tokenize, normalize_text
 
 logger = logging.getLogger(__name__)
 
-async def is_formatted_question(text, llm_router):
-    is_mcq = False
-    clipboard = text
-    is_mcq, clipboard = check_and_modify_mcq_format_flexible(clipboard)
-    print(f"MCQ detected by regex: {is_mcq}")
-    clipman.copy(clipboard)
-    if is_mcq == True:
-        print("MCQ detected by regex: yes")
-        return True, clipboard
-    else:
-        response = await llm_router.generate(
-            model="gemini-1.5-flash-exp-8b",
-            max_tokens=1,
-            messages=[
-                {
-                    "role": "user",
-                    "content": text
-                },
-            ],
-            temperature=0.7,
-            top_p=0.9,
-            stop_sequences=["User:", "Human:", "Assistant:"],
-            system='''You are a formatted question detector. Determine if the following is a multiple-choice question. Answer only 'yes' or 'no'. These are examples of a multiple-choice question in various formats:
+# Patterns used by check_and_modify_mcq_format_flexible
+_NUMBERING_PATTERN = re.compile(r'^(\d+\.|\w\.)\s')
+
+# Matches lines that start with option numbering or lettering (1. 2) a. b) ...) or a {{ marker
+_OPTION_PREFIX = re.compile(r'(?m)^\s*(?:(?:\d+[.)]|[a-zA-Z][.)])\s|\{+)')
+
+# Texts this short with no option markers are never sent to the LLM classifier
+_MIN_AMBIGUOUS_LENGTH = 40
+
+# Capitalized word in the middle of a sentence (after a lowercase letter or clause punctuation)
+_PROPER_NOUN_RE = re.compile(r'(?<=[a-záéíóúñü,;:][ \t])[A-ZÁÉÍÓÚÑ][a-záéíóúñü]+')
+
+# MCQs shorter than this with enough options are answered without retrieval
+_SELF_CONTAINED_MAX_CHARS = 300
+_SELF_CONTAINED_MIN_OPTIONS = 3
+
+# Maximum bytes each retrieved file contributes to the LLM context
+_CONTEXT_FILE_MAX_BYTES = 8192
+
+# System prompts are module constants so every call sends a byte-identical
+# prefix that providers can serve from their prompt cache. Keep max_tokens,
+# temperature and top_p fixed per call site as well, since they are part of
+# what makes a request cache-eligible.
+def _normalize_prompt(prompt):
+    """Strip a prompt and collapse runs of spaces so it stays byte-stable."""
+    return re.sub(r' {2,}', ' ', prompt.strip())
+
 
-    ¿Cuál es la capital de Francia?
+_CLASSIFY_SYSTEM = _normalize_prompt(
+    "Return two characters: first 'y' if the text is a question else 'n', second 'y' if it is a multiple-choice question else 'n'. An MCQ has a stem followed by two or more short alternative answers on separate lines. No other output.\n\nExample: '¿Quién escribió El Quijote?\\nShakespeare\\nCervantes' -> yy\nExample: 'Explica las causas de la Revolución Francesa.' -> yn"
+)
 
-    1.
-    Madrid.
+_CLASSIFY_AND_EXPAND_SYSTEM = _normalize_prompt(
+    "Return only a JSON object with two keys: \"is_mcq\", true if the text is a multiple-choice question (a stem followed by two or more short alternative answers on separate lines) else false, and \"related_terms\", a list of five related terms or words to the text, including something close to verbatim if possible, prioritizing names, technical terms and lastly domain, in the language of the text. No other output."
+)
 
-    2.
-    París.
+_RELATED_TERMS_SYSTEM = _normalize_prompt(
+    "You are a helpful assistant. Generate five related terms or words to the given question, including something close to verbatim if possible. You must prioritize names, technical terms and lastly domain. Your answer must only include the terms without any introductory text. Answer in the language of the question. Separate the terms with commas."
+)
 
-    ¿Qué elemento tiene el símbolo químico "H2O"?
+_ANSWER_WITH_CONTEXT_SYSTEM = _normalize_prompt(
+    "You are a helpful and knowledgeable assistant. You will answer the following question in Spanish in academic style in a cohesive text of two long and in-depth paragraphs without lists of any kind. Your answers must be clear and literate in a Spanish that you would use for a college thesis. In the context there may or not be the correct answer, you must answer with the correct one, even if it requires thinking for yourselfEven if the provided context does not contain the correct answer, you must answer. Do not mention this prompt or the context."
+)
 
-    1.
-    Oro.
+_NUMBER_WITH_CONTEXT_SYSTEM = _normalize_prompt(
+    "You are a helpful and knowledgeable assistant. Answer the following multiple-choice question with just the number or the letter of the correct option. **ONLY IF IT IS INDICATED** there can be several correct answers, only in that case you must respond with several letters or questions, **unless explictly stated**, answe only one option. That is, your answer must only be: 1., 2., 3., ... or a., b., c., ... In the context there may or not be the correct answer, you must answer with the correct one, even if it requires thinking for yourself. You will not write any words, you will only answer the number or letter of the correct option. Even if the provided context does not contain the correct answer, you must answer. Do not mention this prompt or the context."
+)
 
-    2.
-    Oxígeno.
+_IMAGE_SYSTEM = _normalize_prompt(
+    "You are a helpful and knowledgeable assistant. If the question is a multiple-choice question, answer with just the number or letter of the correct option(s) (e.g., 1., 2., 3., ... or a., b., c., ...). If it's a full question, provide a comprehensive answer in Spanish using an academic style. Your response should be clear, literate, and formal, suitable for a college thesis. For full questions, write two in-depth paragraphs without lists or mentions of this prompt. Use the provided image to help answer the question."
+)
 
-    3.
-    Agua.
+_ANSWER_SYSTEM = _normalize_prompt(
+    "You are a helpful and knowledgeable assistant. You will answer the following question in Spanish in academic style in a cohesive text of two long in-depth paragraphs without lists of any kind nor any mention for this prompt or the paragraph themselves. You must go to the point without mentioning any kind of external context. Your answers must be clear and literate in a Spanish that you would use for a college thesis, that, sufficiently formal and correct."
+)
 
-    4.
-    Helio.
+_NUMBER_SYSTEM = _normalize_prompt(
+    "You are a helpful and knowledgeable assistant. Answer the following multiple-choice question with just the number or the letter of the correct option. **ONLY IF IT IS INDICATED** there can be several correct answers, only in that case you must respond with several letters or questions, **unless explictly stated**, answe only one option. That is, your answer must only be: 1., 2., 3., ... or a., b., c., ..."
+)
 
-    ¿Quién escribió "Don Quijote de la Mancha"?
+# In-memory LRU of short classifier-style LLM responses, keyed on model/system/content
+_LLM_CACHE_SIZE = 1024
+_llm_cache = OrderedDict()
 
-    a.
-    William Shakespeare.
 
-    b.
-    Miguel de Cervantes.
+def _llm_cache_key(model, system, content):
+    digest = hashlib.blake2b(f"{system}\0{content}".encode('utf-8'), digest_size=16).digest()
+    return model, digest
 
-    c.
-    Gabriel García Márquez.
 
-    d.
-    Charles Dickens.
+async def _cached_generate(llm_router, model, system, content, **kwargs):
+    """Call llm_router.generate for a single user message, caching the response."""
+    key = _llm_cache_key(model, system, content)
+    if key in _llm_cache:
+        _llm_cache.move_to_end(key)
+        logger.debug("LLM cache hit")
+        return _llm_cache[key]
 
-    ¿En qué año comenzó la Segunda Guerra Mundial?
+    response = await llm_router.generate(
+        model=model,
+        messages=[
+            {
+                "role": "user",
+                "content": content
+            }
+        ],
+        system=system,
+        **kwargs
+    )
+    _llm_cache[key] = response
+    if len(_llm_cache) > _LLM_CACHE_SIZE:
+        _llm_cache.popitem(last=False)
+    return response
 
-    1.
-    1914.
+# Models sometimes wrap JSON answers in a markdown code fence
+_CODE_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$')
 
-    2.
-    1939.
+# LLM verdicts of is_formatted_question keyed on a text digest, persisted across restarts
+_MCQ_CACHE_SIZE = 512
+_MCQ_CACHE_FILE = Path.home() / ".clipbrd" / "mcq_cache.json"
+_mcq_cache = OrderedDict()
 
-    3.
-    1945.
+# Related search terms keyed on a digest of the normalized question, persisted across restarts
+_RELATED_TERMS_CACHE_SIZE = 1024
+_RELATED_TERMS_CACHE_FILE = Path.home() / ".clipbrd" / "related_terms_cache.json"
+_related_terms_cache = OrderedDict()
 
-    4.
-    1929.
 
-    ¿Quién pintó la Mona Lisa?
+def _text_digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
 
-    a.
-    Vincent Van Gogh.
 
-    b.
-    Pablo Picasso.
+def _related_terms_key(question):
+    # Retries of the same question often differ only in case or whitespace
+    return _text_digest(' '.join(question.lower().split()))
 
-    c.
-    Leonardo da Vinci.
 
-    d.
-    Claude Monet.
+def _remember_related_terms(question, related_terms):
+    _related_terms_cache[_related_terms_key(question)] = related_terms
+    if len(_related_terms_cache) > _RELATED_TERMS_CACHE_SIZE:
+        _related_terms_cache.popitem(last=False)
 
-    ¿Cuál es el planeta más grande del sistema solar?
 
-    a.
-    Marte.
+def _load_json_cache(cache_file, cache, max_size, convert, label):
+    try:
+        if cache_file.exists():
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            cache.update((key, convert(value)) for key, value in data.items())
+            while len(cache) > max_size:
+                cache.popitem(last=False)
+            logger.debug(f"Loaded {len(cache)} cached {label}")
+    except Exception as e:
+        logger.error(f"Error loading cached {label}: {e}")
 
-    b. Júpiter.
 
-    c.
-    Tierra.
+def _save_json_cache(cache_file, cache, label):
+    temp_file = cache_file.with_suffix('.tmp')
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(dict(cache), f)
+        temp_file.replace(cache_file)
+        logger.debug(f"Saved {len(cache)} cached {label}")
+    except Exception as e:
+        logger.error(f"Error saving cached {label}: {e}")
+        if temp_file.exists():
+            temp_file.unlink()
 
-    d.
-    Venus.
 
-    ¿Qué país construyó el primer ferrocarril operativo del mundo?
+def load_mcq_cache():
+    """Load persisted MCQ classifier verdicts."""
+    _load_json_cache(_MCQ_CACHE_FILE, _mcq_cache, _MCQ_CACHE_SIZE, bool, "MCQ verdicts")
 
-    a.
-    Estados Unidos.
 
-    b.
-    Alemania.
+def save_mcq_cache():
+    """Persist MCQ classifier verdicts so restarts keep cache hits."""
+    _save_json_cache(_MCQ_CACHE_FILE, _mcq_cache, "MCQ verdicts")
 
-    c.
-    Reino Unido.
 
-    d.
-    Japón.
+def load_related_terms_cache():
+    """Load persisted related search terms."""
+    _load_json_cache(_RELATED_TERMS_CACHE_FILE, _related_terms_cache, _RELATED_TERMS_CACHE_SIZE,
+                     list, "related terms")
 
-    {Quién escribió El Quijote?
-    Shakespeare
-    Cervantes
-    Borges
-    
-    {{En qué año fue la Revolución Francesa?
-    1989
-    1789
-    1833
-    
-    {{Quién pintó la Mona Lisa?
-    Picasso
-    Velázquez
-    Da Vinci
 
-    {{Cuál es la capital de España?
-    Barcelona
-    Sevilla
-    Madrid
-    Toledo
+def save_related_terms_cache():
+    """Persist related search terms so restarts keep cache hits."""
+    _save_json_cache(_RELATED_TERMS_CACHE_FILE, _related_terms_cache, "related terms")
 
-    {{En qué año llegó Cristóbal Colón a América?
-    1492
-    1592
-    1692
-
-    {{Quién escribió "Cien años de soledad"?
-    Gabriel García Márquez
-    Mario Vargas Llosa
-    Pablo Neruda
-
-    {{Cuál es el río más largo del mundo?
-    Nilo
-    Amazonas
-    Yangtsé
-
-    {{Quién descubrió la penicilina?
-    Marie Curie
-    Alexander Fleming
-    Louis Pasteur
-
-    {{En qué año cayó el muro de Berlín?
-    1989
-    1991
-    1987
-
-    {{Quién escribió "Don Juan Tenorio"?
-    Lope de Vega
-    José Zorrilla
-    Federico García Lorca
-    Rubén Darío
-
-    {{Quién pintó "La noche estrellada"?
-    Vincent van Gogh
-    Claude Monet
-    Salvador Dalí
-
-    {{En qué año se declaró la independencia de Estados Unidos?
-    1776
-    1812
-    1848
-
-    {{Quién escribió "La Ilíada" y "La Odisea"?
-    Virgilio
-    Homero
-    Sófocles
-
-    {{Cuál es el océano más grande del mundo?
-    Atlántico
-    Índico
-    Pacífico
-
-    {{Quién compuso "Las cuatro estaciones"?
-    Mozart
-    Bach
-    Vivaldi
-
-    {{En qué año comenzó la Segunda Guerra Mundial?
-    1914
-    1939
-    1945
-    1936
-
-    {{Quién escribió "Hamlet"?
-    William Shakespeare
-    Oscar Wilde
-    James Joyce
-    Virginia Woolf
-
-    {{Cuál es el país más grande del mundo por superficie?
-    Canadá
-    China
-    Rusia
-
-    ¿Cuál es la capital de Francia?
-
-    1. Madrid
-    2. París 
-    3. Berlín
-    4. Roma
-
-    Complete the sentence with the correct option:
-    The capital of France is ______.
-    a) Madrid
-    b) París
-    c) Berlín 
-    d) Roma
-
-    Fill in the blank with the correct option:
-    The ______ of France is París.
-    a) capital
-    b) country
-    c) city
-    d) town
-
-    Which of the following is the capital of France?
-    1. Madrid
-    2. París
-    3. Berlín
-    4. Roma
-
-    The capital of France is
-    a. Madrid
-    b. París
-    c. Berlín
-    d. Roma
-
-    París is the capital of
-    a) Spain
-    b) France 
-    c) Germany
-    d) Italy
-
-    Choose the correct option to complete the sentence:
-    París is the ______ of France.
-    a) capital
-    b) country
-    c) city
-    d) town'''
-        )
 
-        generated_text = response
-        print(f"MCQ detected by AI: {generated_text}")
-        if generated_text.lower() == "yes":
-            is_mcq = True
-            print("MCQ detected by AI: yes")
-            return True, clipboard
+async def is_formatted_question(text, llm_router, expand_terms=False):
+    is_mcq = False
+    clipboard = text
+    is_mcq, clipboard, was_modified = check_and_modify_mcq_format_flexible(clipboard)
+    print(f"MCQ detected by regex: {is_mcq}")
+    if is_mcq == True:
+        print("MCQ detected by regex: yes")
+        return True, clipboard, was_modified
+
+    # Multi-line text was accepted above, so this is single-line text; a short line
+    # without an option prefix can't be an MCQ and skips the LLM round-trip
+    if not _OPTION_PREFIX.search(text) and len(text) < _MIN_AMBIGUOUS_LENGTH:
+        logger.debug("MCQ rejected: short text without option prefixes")
+        return False, clipboard, False
+    else:
+        digest = _text_digest(clipboard)
+        if digest in _mcq_cache:
+            _mcq_cache.move_to_end(digest)
+            is_mcq = _mcq_cache[digest]
+            logger.debug(f"MCQ detected by cache: {is_mcq}")
+            return is_mcq, clipboard, False
+
+        if expand_terms:
+            # Classify and generate the search terms in one round-trip
+            is_mcq, related_terms = await classify_and_expand(text, llm_router)
+            if related_terms:
+                _remember_related_terms(text, related_terms)
         else:
-            is_mcq = False
-            return False, clipboard
+            _, is_mcq = await classify_question(text, llm_router)
+        print(f"MCQ detected by AI: {is_mcq}")
+        _mcq_cache[digest] = is_mcq
+        if len(_mcq_cache) > _MCQ_CACHE_SIZE:
+            _mcq_cache.popitem(last=False)
+        return is_mcq, clipboard, False
 
 
 async def is_question(text, llm_router):
-    response = await llm_router.generate(
+    question, _ = await classify_question(text, llm_router)
+    print(f"Question detected: {question}")
+    return question
+
+
+async def classify_question(text, llm_router):
+    """Classify text as question and/or MCQ with a single LLM call.
+
+    Returns:
+    tuple: (is_question, is_mcq)
+    """
+    response = await _cached_generate(
+        llm_router,
         model="gemini-1.5-flash-exp-8b",
-        max_tokens=3,
-        messages=[
-            {
-                "role": "user",
-                "content": text
-            }
-        ],
-        temperature=0.7, 
-        top_p=0.9,
+        content=text,
+        max_tokens=2,
+        temperature=0.0,
+        top_p=1.0,
         stop_sequences=["User:", "Human:", "Assistant:"],
-        system="You are a formatted question detector. Determine if the following is a question. Answer only 'yes' or 'no'."
+        system=_CLASSIFY_SYSTEM
     )
-    generated_text = response
-    print(f"Question detected: {generated_text}")
-    if generated_text == "yes":
-        return True
-    else:
-        return False
+    flags = response.strip().lower()
+    return flags[:1] == "y", flags[1:2] == "y"
+
+
+async def classify_and_expand(text, llm_router):
+    """Classify text as MCQ and generate related search terms with a single LLM call.
+
+    Returns:
+    tuple: (is_mcq, related_terms)
+    """
+    try:
+        response = await _cached_generate(
+            llm_router,
+            model="gemini-2.0-flash-exp-8b",
+            content=text,
+            max_tokens=80,
+            temperature=0.0,
+            top_p=1.0,
+            stop_sequences=["User:", "Human:", "Assistant:"],
+            system=_CLASSIFY_AND_EXPAND_SYSTEM
+        )
+        data = json.loads(_CODE_FENCE.sub('', response.strip()))
+        related_terms = [str(term).strip() for term in data.get("related_terms", []) if str(term).strip()]
+        return bool(data.get("is_mcq")), related_terms
+    except Exception as e:
+        logger.error(f"Error in classify_and_expand: {str(e)}")
+        _, is_mcq = await classify_question(text, llm_router)
+        return is_mcq, []
 
 
 async def get_related_terms(question, llm_router):
     """Generate related terms for context search."""
     logger.info("Starting get_related_terms")
+    key = _related_terms_key(question)
+    if key in _related_terms_cache:
+        _related_terms_cache.move_to_end(key)
+        logger.info("Using cached related terms")
+        return _related_terms_cache[key]
     try:
         logger.info(f"Generating related terms for question: {question[:200]}...")
+        # Already memoized by _related_terms_cache, and greedy so the persisted terms are reproducible
         related_terms_response = await llm_router.generate(
             model="gemini-2.0-flash-exp-8b",
-            max_tokens=30,
             messages=[
                 {
                     "role": "user",
                     "content": question
                 }
             ],
-            temperature=0.7,
-            top_p=0.9,
+            max_tokens=30,
+            temperature=0.0,
+            top_p=1.0,
             stop_sequences=["User:", "Human:", "Assistant:"],
-            system="You are a helpful assistant. Generate five related terms or words to the given question, including something close to verbatim if possible. You must prioritize names, technical terms and lastly domain. Your answer must only include the terms without any introductory text. Answer in the language of the question. Separate the terms with commas."
+            system=_RELATED_TERMS_SYSTEM
         )
         logger.info(f"Generated related terms response: {related_terms_response}")
         related_terms = related_terms_response.split(", ")
         logger.info(f"Split related terms: {related_terms}")
+        _remember_related_terms(question, related_terms)
         return related_terms
     except Exception as e:
         logger.error(f"Error in get_related_terms: {str(e)}", exc_info=True)
         return []
 
 
+def _read_context_file(file_path):
+    """Read the first _CONTEXT_FILE_MAX_BYTES of a context file as text.
+
+    Processed chunk files are written as UTF-8, so undecodable bytes
+    (including a multi-byte character cut by the size cap) are replaced.
+    """
+    try:
+        logger.info(f"Reading file: {file_path}")
+        with open(file_path, 'rb') as file:
+            file_content = file.read(_CONTEXT_FILE_MAX_BYTES).decode('utf-8', errors='replace')
+        logger.info(f"Added content from {file_path} ({len(file_content)} chars)")
+        return file_content
+    except Exception as e:
+        logger.error(f"Failed to read {file_path}: {str(e)}")
+        return ""
+
+
 async def search_for_context(question, llm_router, search, inverted_index, documents):
     """Search for relevant context using related terms."""
     logger.info("Starting search_for_context")
@@ -334,20 +331,31 @@ async def search_for_context(question, llm_router, search, inverted_index, docum
         logger.info(f"Got related terms: {related_terms}")
 
         # Create queries with both original and normalized text
+        terms_query = " ".join(related_terms)
         original_queries = [
             question,  # Original question
-            " ".join(related_terms),  # Related terms
-            f"{question} {' '.join(related_terms)}"  # Combined
+            terms_query,  # Related terms
+            f"{question} {terms_query}"  # Combined
         ]
         
-        # Create normalized versions of the queries
-        normalized_queries = [normalize_text(q) for q in original_queries]
+        # Create normalized versions of the queries. normalize_text is cached and
+        # works per character, so the combined query reuses the two normalized parts.
+        normalized_question = normalize_text(question)
+        normalized_terms = normalize_text(terms_query)
+        normalized_queries = [
+            normalized_question,
+            normalized_terms,
+            f"{normalized_question} {normalized_terms}"
+        ]
         logger.info(f"Searching with original queries: {original_queries}")
         logger.info(f"Searching with normalized queries: {normalized_queries}")
 
-        # Search for related files using all queries
-        all_results = []
+        # Search for related files using all queries, keeping only the best-ranked
+        # entry per file path: (ranking key, file_path, query_matches, exact_match, original_match)
+        path_to_best = {}
         query_matches = {}  # Track how many times each document is found
+        docs = documents
+        n_docs = len(docs)
         
         # First process original queries
         for query in original_queries:
@@ -362,26 +370,28 @@ async def search_for_context(question, llm_router, search, inverted_index, docum
             
             # Process results with high boost for exact matches
             for doc_id, score in results:
-                if doc_id < len(documents):
-                    doc = documents[doc_id]
-                    file_path = doc.get('file_path')
-                    if file_path:
-                        # Check for exact matches in original content
-                        doc_content = doc.get('content', '').lower()
-                        exact_match = all(term.lower() in doc_content for term in query_terms if len(term) > 1)
-                        
-                        # Heavily boost score for exact matches with original query
-                        if exact_match:
-                            score *= 5.0  # Much higher boost for original query exact matches
-                        
-                        query_matches[doc_id] = query_matches.get(doc_id, 0) + (2 if exact_match else 1)
-                        all_results.append({
-                            'file_path': file_path,
-                            'score': score * (1 + query_matches[doc_id]),
-                            'query_matches': query_matches[doc_id],
-                            'exact_match': exact_match,
-                            'original_match': True
-                        })
+                if doc_id >= n_docs:
+                    continue
+                doc = docs[doc_id]
+                file_path = doc.get('file_path')
+                if not file_path:
+                    continue
+
+                # Check for exact matches in original content
+                doc_content = doc.get('content', '').lower()
+                exact_match = all(term.lower() in doc_content for term in query_terms if len(term) > 1)
+
+                # Heavily boost score for exact matches with original query
+                if exact_match:
+                    score *= 5.0  # Much higher boost for original query exact matches
+
+                query_matches[doc_id] = query_matches.get(doc_id, 0) + (2 if exact_match else 1)
+                final_score = score * (1 + query_matches[doc_id])
+                # Original exact matches rank first, then by score
+                score_key = (exact_match, final_score)
+                best = path_to_best.get(file_path)
+                if best is None or score_key > best[0]:
+                    path_to_best[file_path] = (score_key, file_path, query_matches[doc_id], exact_match, True)
 
         # Then process normalized queries with lower weight
         for query in normalized_queries:
@@ -396,69 +406,57 @@ async def search_for_context(question, llm_router, search, inverted_index, docum
             
             # Process results with lower boost
             for doc_id, score in results:
-                if doc_id < len(documents):
-                    doc = documents[doc_id]
-                    file_path = doc.get('file_path')
-                    if file_path:
-                        # Check for matches in normalized content
-                        doc_normalized = doc.get('normalized_content', '').lower()
-                        exact_match = all(term.lower() in doc_normalized for term in query_terms if len(term) > 1)
-                        
-                        # Lower boost for normalized matches
-                        if exact_match:
-                            score *= 1.5  # Lower boost for normalized matches
-                        
-                        query_matches[doc_id] = query_matches.get(doc_id, 0) + 0.5  # Lower weight for normalized matches
-                        all_results.append({
-                            'file_path': file_path,
-                            'score': score * (1 + query_matches[doc_id]),
-                            'query_matches': query_matches[doc_id],
-                            'exact_match': exact_match,
-                            'original_match': False
-                        })
-
-        # Sort results prioritizing original exact matches first, then score
-        sorted_results = sorted(all_results, 
-                              key=lambda x: (x['original_match'] and x['exact_match'], x['score']), 
-                              reverse=True)
-
-        # Keep only top results with score above threshold
-        min_score = 10.0  # Minimum score threshold
-        unique_results = []
-        seen_paths = set()
-        for result in sorted_results:
-            if result['score'] < min_score:
-                continue
-            if result['file_path'] not in seen_paths:
-                seen_paths.add(result['file_path'])
-                unique_results.append(result)
-                logger.info(f"Added file path: {result['file_path']} with score {result['score']} matching {result['query_matches']} queries (exact match: {result['exact_match']}, original match: {result['original_match']})")
-                if len(unique_results) >= 5:  # Limit to top 5 results
-                    break
+                if doc_id >= n_docs:
+                    continue
+                doc = docs[doc_id]
+                file_path = doc.get('file_path')
+                if not file_path:
+                    continue
+
+                # Check for matches in normalized content
+                doc_normalized = doc.get('normalized_content', '').lower()
+                exact_match = all(term.lower() in doc_normalized for term in query_terms if len(term) > 1)
+
+                # Lower boost for normalized matches
+                if exact_match:
+                    score *= 1.5  # Lower boost for normalized matches
+
+                query_matches[doc_id] = query_matches.get(doc_id, 0) + 0.5  # Lower weight for normalized matches
+                final_score = score * (1 + query_matches[doc_id])
+                score_key = (False, final_score)
+                best = path_to_best.get(file_path)
+                if best is None or score_key > best[0]:
+                    path_to_best[file_path] = (score_key, file_path, query_matches[doc_id], exact_match, False)
+
+        if not path_to_best:
+            logger.info("No search results found")
+            return ""
+
+        # Keep files scoring within a fraction of the best hit so that at least one
+        # file survives whenever there is any signal
+        top_score = max(entry[0][1] for entry in path_to_best.values())
+        cutoff = max(1.0, top_score * 0.25)
+        logger.info(f"Top score {top_score}, minimum score cutoff {cutoff}")
+
+        # Take the top 5 files; entries are already deduplicated by path
+        top_results = heapq.nlargest(
+            5, (entry for entry in path_to_best.values() if entry[0][1] >= cutoff)
+        )
+        for (_, score), file_path, matches, exact_match, original_match in top_results:
+            logger.info(f"Added file path: {file_path} with score {score} matching {matches} queries (exact match: {exact_match}, original match: {original_match})")
 
         # Extract file paths from results
-        relevant_files = [result['file_path'] for result in unique_results]
+        relevant_files = [result[1] for result in top_results]
         logger.info(f"Deduplicated relevant files: {relevant_files}")
+        if not relevant_files:
+            logger.info("No files above the score cutoff")
+            return ""
 
-        # Create the context for answering the question
-        context = ""
-        for file_path in relevant_files:
-            try:
-                logger.info(f"Reading file: {file_path}")
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    file_content = file.read()
-                    context += file_content + "\n\n"
-                    logger.info(f"Added content from {file_path}, current context length: {len(context)}")
-            except UnicodeDecodeError:
-                logger.warning(f"UTF-8 decode failed for {file_path}, trying latin-1")
-                try:
-                    with open(file_path, 'r', encoding='latin-1') as file:
-                        file_content = file.read()
-                        context += file_content + "\n\n"
-                        logger.info(f"Added content from {file_path} (latin-1), current context length: {len(context)}")
-                except Exception as e:
-                    logger.error(f"Failed to read {file_path} with latin-1: {str(e)}")
+        # Create the context for answering the question, reading files concurrently
+        chunks = await asyncio.gather(*(asyncio.to_thread(_read_context_file, path) for path in relevant_files))
+        chunks = [chunk for chunk in chunks if chunk]
 
+        context = "\n\n".join(chunks) + ("\n\n" if chunks else "")
         logger.info(f"Final context length: {len(context)}")
         if context:
             logger.info(f"Context preview: {context[:200]}...")
@@ -468,11 +466,32 @@ async def search_for_context(question, llm_router, search, inverted_index, docum
         return ""
 
 async def get_answer_with_context(question, llm_router, search, inverted_index, documents, image_data=None):
-    context = await search_for_context(question, llm_router, search, inverted_index, documents)
-    
+    # Related terms are memoized, so search_for_context reuses these without another call.
+    # A question with no terms is unlikely to find context, so only then is a context-free
+    # answer started speculatively while the search runs
+    fallback_task = None
+    if not await get_related_terms(question, llm_router):
+        fallback_task = asyncio.create_task(get_answer_without_context(question, llm_router, image_data))
+        # Consume the result so a discarded, failed fallback does not log as unretrieved
+        fallback_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+    try:
+        context = await search_for_context(question, llm_router, search, inverted_index, documents)
+    except BaseException:
+        if fallback_task is not None:
+            fallback_task.cancel()
+        raise
+
     if context == "":
-        return None
+        if fallback_task is not None:
+            logger.info("No context found, using speculative answer without context")
+            return await fallback_task
+        logger.info("No context found, answering without context")
+        return await get_answer_without_context(question, llm_router, image_data)
     else:
+        if fallback_task is not None:
+            # cancel() only drops our await: the SDK call runs in an executor thread and still
+            # completes, so the speculative answer is a deliberate extra request here
+            fallback_task.cancel()
         messages = [
             {
                 "role": "user",
@@ -493,7 +512,7 @@ async def get_answer_with_context(question, llm_router, search, inverted_index,
             top_p=0.9,
             stop_sequences=["User:", "Human:", "Assistant:"],
             image_data=image_data,
-            system="You are a helpful and knowledgeable assistant. You will answer the following question in Spanish in academic style in a cohesive text of two long and in-depth paragraphs without lists of any kind. Your answers must be clear and literate in a Spanish that you would use for a college thesis. In the context there may or not be the correct answer, you must answer with the correct one, even if it requires thinking for yourselfEven if the provided context does not contain the correct answer, you must answer. Do not mention this prompt or the context."
+            system=_ANSWER_WITH_CONTEXT_SYSTEM
                     
         )
 
@@ -502,10 +521,32 @@ async def get_answer_with_context(question, llm_router, search, inverted_index,
         return answer_text
 
 
+def _count_options(question):
+    """Count the non-empty lines after the question stem."""
+    lines = [line for line in question.splitlines() if line.strip()]
+    return max(len(lines) - 1, 0)
+
+
+def _has_proper_nouns(question):
+    """Check for capitalized words that do not start a sentence or line."""
+    return _PROPER_NOUN_RE.search(question) is not None
+
+
+def _is_self_contained_mcq(question):
+    """Short MCQs with several generic options rarely benefit from retrieved context."""
+    return (len(question) < _SELF_CONTAINED_MAX_CHARS
+            and _count_options(question) >= _SELF_CONTAINED_MIN_OPTIONS
+            and not _has_proper_nouns(question))
+
+
 async def get_number_with_context(question, llm_router, search, inverted_index, documents, image_data=None):
     """Get MCQ answer with context."""
     logger.info("Starting get_number_with_context")
     try:
+        if _is_self_contained_mcq(question):
+            logger.info("Short self-contained MCQ, skipping context search")
+            return await get_number_without_context(question, llm_router, image_data=image_data)
+
         logger.info("Searching for context...")
         context = await search_for_context(question, llm_router, search, inverted_index, documents)
         
@@ -537,7 +578,7 @@ async def get_number_with_context(question, llm_router, search, inverted_index,
                         top_p=0.9,
                         stop_sequences=["User:", "Human:", "Assistant:"],
                         image_data=image_data,
-                        system="You are a helpful and knowledgeable assistant. Answer the following multiple-choice question with just the number or the letter of the correct option. **ONLY IF IT IS INDICATED** there can be several correct answers, only in that case you must respond with several letters or questions, **unless explictly stated**, answe only one option. That is, your answer must only be: 1., 2., 3., ... or a., b., c., ... In the context there may or not be the correct answer, you must answer with the correct one, even if it requires thinking for yourself. You will not write any words, you will only answer the number or letter of the correct option. Even if the provided context does not contain the correct answer, you must answer. Do not mention this prompt or the context."
+                        system=_NUMBER_WITH_CONTEXT_SYSTEM
                     ),
                     timeout=20.0
                 )
@@ -581,7 +622,7 @@ async def get_answer_with_image(question, llm_router, image_data=None):
        temperature=0.7,
        top_p=0.9,
        stop_sequences=["User:", "Human:", "Assistant:"],
-       system="You are a helpful and knowledgeable assistant. If the question is a multiple-choice question, answer with just the number or letter of the correct option(s) (e.g., 1., 2., 3., ... or a., b., c., ...). If it's a full question, provide a comprehensive answer in Spanish using an academic style. Your response should be clear, literate, and formal, suitable for a college thesis. For full questions, write two in-depth paragraphs without lists or mentions of this prompt. Use the provided image to help answer the question."
+       system=_IMAGE_SYSTEM
    )
 
    answer_text = response
@@ -605,7 +646,7 @@ async def get_answer_without_context(question, llm_router, image_data=None):
        top_p=0.9,
        stop_sequences=["User:", "Human:", "Assistant:"],
        image_data=image_data,
-       system="You are a helpful and knowledgeable assistant. You will answer the following question in Spanish in academic style in a cohesive text of two long in-depth paragraphs without lists of any kind nor any mention for this prompt or the paragraph themselves. You must go to the point without mentioning any kind of external context. Your answers must be clear and literate in a Spanish that you would use for a college thesis, that, sufficiently formal and correct."
+       system=_ANSWER_SYSTEM
    )
 
    # Extracting the answer text from the response
@@ -628,7 +669,7 @@ async def get_number_without_context(question, llm_router, image_data=None):
        top_p=0.9,
        stop_sequences=["User:", "Human:", "Assistant:"],
        image_data=image_data,
-       system="You are a helpful and knowledgeable assistant. Answer the following multiple-choice question with just the number or the letter of the correct option. **ONLY IF IT IS INDICATED** there can be several correct answers, only in that case you must respond with several letters or questions, **unless explictly stated**, answe only one option. That is, your answer must only be: 1., 2., 3., ... or a., b., c., ..."
+       system=_NUMBER_SYSTEM
    )
 
    # Extracting the answer text from the response
@@ -648,25 +689,26 @@ def check_and_modify_mcq_format_flexible(text):
    Returns:
    bool: True if the format is detected, False otherwise.
    str: The modified text if the format is detected and no existing numbering/lettering, otherwise the original text.
+   bool: True if numbering was added to the text.
    """
-   # Regular expression to detect the MCQ format with or without separation
-   mcq_pattern = r'^(.*?)(\n\s*\n|\n)(.*?)((\n\s*\n|\n).*)*$'
-   # Regular expression to detect existing numbering or lettering 
-   numbering_pattern = r'^(\d+\.|\w\.)\s'
-
-   # Check if the text matches the MCQ format
-   if re.match(mcq_pattern, text, re.DOTALL):
-       # Split text into options
-       options = re.split(r'\n\s*\n|\n', text)
-
-       # Check if the first option (after the question) is numbered or lettered
-       if re.match(numbering_pattern, options[1]):
-           # Already numbered/lettered, return original text
-           return True, text
-       else:
-           # Add numbers before each option except the first one
-           modified_text = options[0] + '\n\n' + '\n\n'.join(
-               f"{i}. {opt}" for i, opt in enumerate(options[1:], 1))
-           return True, modified_text
+   # A question plus at least one option needs a line break
+   if '\n' not in text:
+       return False, text, False
+
+   # Split text into options: one per line, dropping blank lines between them
+   lines = text.split('\n')
+   options = [lines[0]] + [line for line in lines[1:-1] if line.strip()] + [lines[-1]]
+   if len(options) < 2:
+       return False, text, False
+
+   # Check if the first option (after the question) is numbered or lettered
+   if _NUMBERING_PATTERN.match(options[1]):
+       # Already numbered/lettered, return original text
+       return True, text, False
    else:
-       return False, text
\ No newline at end of file
+       # Add numbers before each option except the first one
+       buf = [options[0]]
+       append = buf.append
+       for i, opt in enumerate(options[1:], 1):
+           append(f"\n\n{i}. {opt}")
+       return True, ''.join(buf), True
\ No newline at end of file
@@ -2,19 +2,48 @@ import os
 import sys
 import json
 import logging
-import base64
 import io
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, auto
-from typing import Optional, Dict, Callable, Any
+from typing import Optional, Dict, Callable, Any, Set, Tuple
 from dataclasses import dataclass
 from pathlib import Path
-from PIL import ImageGrab, Image
-from pynput import keyboard
+
+try:
+    # SIMD-accelerated codec that returns str without an intermediate bytes copy
+    from pybase64 import b64encode_as_string
+except ImportError:
+    import base64
+
+    def b64encode_as_string(data) -> str:
+        return base64.b64encode(data).decode('ascii')
+
+try:
+    # Captures through cached OS handles instead of PIL's per-call grab
+    import mss
+except ImportError:
+    mss = None
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# mss instances hold per-thread OS handles, so each capturing thread keeps its own
+_mss_local = threading.local()
+
+def _grab_screen():
+    """Capture the primary monitor as a PIL image."""
+    from PIL import Image, ImageGrab
+
+    if mss is None:
+        return ImageGrab.grab()
+    sct = getattr(_mss_local, 'sct', None)
+    if sct is None:
+        sct = _mss_local.sct = mss.mss()
+    raw = sct.grab(sct.monitors[1])
+    # Decode the BGRA buffer straight into an RGB image
+    return Image.frombuffer('RGB', raw.size, raw.bgra, 'raw', 'BGRX')
+
 class ScreenshotType(Enum):
     """Types of screenshots available."""
     FULL = auto()
@@ -26,17 +55,95 @@ class ScreenshotType(Enum):
 class ScreenshotConfig:
     """Configuration for screenshot functionality."""
     shortcuts: Dict[str, str]
-    format: str = "PNG"
+    format: str = "JPEG"
+    jpeg_quality: int = 85
+    png_compress_level: int = 1
+    max_dimension: int = 1568
     config_dir: Path = Path.home() / ".clipbrd"
 
+    @property
+    def mime_type(self) -> str:
+        """MIME type of the encoded screenshots."""
+        if self.format.upper() in ("JPEG", "JPG"):
+            return "image/jpeg"
+        return f"image/{self.format.lower()}"
+
+DEFAULT_SHORTCUTS = {
+    "full_screenshot": "<ctrl>+<shift>+f",
+    "region_screenshot": "<ctrl>+<shift>+r",
+    "predefined_screenshot": "<ctrl>+<shift>+p",
+    "custom_screenshot": "<ctrl>+<shift>+l"
+}
+
+CONFIG_FILENAME = "screenshot_config.json"
+# Config file used by the module-level load_shortcuts/save_shortcuts helpers
+_CONFIG_FILE = ScreenshotConfig.config_dir / CONFIG_FILENAME
+
+# Parsed config files keyed by path, with the st_mtime_ns they were read at
+_config_cache: Dict[Path, Tuple[int, Dict[str, Any]]] = {}
+
+def _read_config(config_file: Path) -> Dict[str, Any]:
+    """Read a JSON config file, returning an empty dict if it does not exist.
+
+    The parsed result is reused until the file's modification time changes.
+    """
+    try:
+        mtime = config_file.stat().st_mtime_ns
+        cached = _config_cache.get(config_file)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        # json accepts UTF-8 bytes directly, skipping the text-mode decode layer
+        data = json.loads(config_file.read_bytes())
+    except FileNotFoundError:
+        _config_cache.pop(config_file, None)
+        return {}
+    _config_cache[config_file] = (mtime, data)
+    return data
+
+def _write_config(config_file: Path, data: Dict[str, Any]) -> bool:
+    """Atomically write a JSON config file, skipping the write if the content is unchanged.
+
+    Returns True if the file was written.
+    """
+    payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    try:
+        if config_file.read_bytes() == payload:
+            return False
+    except FileNotFoundError:
+        pass
+
+    # Write to temporary file first, then atomically rename
+    temp_file = config_file.with_suffix('.tmp')
+    try:
+        try:
+            f = open(temp_file, 'wb', buffering=0)
+        except FileNotFoundError:
+            # Only create the config directory when a write finds it missing
+            config_file.parent.mkdir(parents=True, exist_ok=True)
+            f = open(temp_file, 'wb', buffering=0)
+        with f:
+            f.write(payload)
+            os.fsync(f.fileno())
+        os.replace(temp_file, config_file)
+        _config_cache[config_file] = (config_file.stat().st_mtime_ns, json.loads(payload))
+    except Exception:
+        if temp_file.exists():
+            temp_file.unlink()
+        raise
+    return True
+
 class ScreenshotManager:
     """Manages screenshot functionality."""
     
     def __init__(self, config: Optional[ScreenshotConfig] = None):
         self.config = config or self._load_default_config()
-        self.hotkey_listeners: Dict[str, keyboard.GlobalHotKeys] = {}
+        # Single pynput GlobalHotKeys listener serving all shortcuts
+        self._hotkeys: Optional[Any] = None
         self.callback: Optional[Callable] = None
-        self._screenshot_event = threading.Event()
+        # Single long-lived worker so repeated hotkey presses queue instead of spawning threads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shot')
+        self._pending: Set[ScreenshotType] = set()
+        self._pending_lock = threading.Lock()
         self._setup_logging()
         logger.info("Screenshot manager initialized")
 
@@ -53,14 +160,7 @@ class ScreenshotManager:
     @staticmethod
     def _load_default_config() -> ScreenshotConfig:
         """Load default screenshot configuration."""
-        return ScreenshotConfig(
-            shortcuts={
-                "full_screenshot": "<ctrl>+<shift>+f",
-                "region_screenshot": "<ctrl>+<shift>+r",
-                "predefined_screenshot": "<ctrl>+<shift>+p",
-                "custom_screenshot": "<ctrl>+<shift>+l"
-            }
-        )
+        return ScreenshotConfig(shortcuts=dict(DEFAULT_SHORTCUTS))
 
     def initialize(self) -> bool:
         """Initialize the screenshot manager."""
@@ -80,14 +180,35 @@ class ScreenshotManager:
     def take_screenshot(self, screenshot_type: ScreenshotType = ScreenshotType.FULL) -> Optional[str]:
         """Take a screenshot and return base64 encoded string."""
         try:
+            # PIL is only needed once a screenshot is actually taken
+            from PIL import Image
+
             # For now, always take full screenshot as specified
-            screenshot = ImageGrab.grab()
+            screenshot = _grab_screen()
+
+            # Downscale in place to the longest side vision APIs make use of,
+            # releasing the full-resolution buffer instead of keeping a copy alive
+            max_dimension = self.config.max_dimension
+            screenshot.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
             
-            # Convert to base64
+            # Convert to base64; JPEG is far smaller than PNG and accepted by vision APIs
             buffered = io.BytesIO()
-            screenshot.save(buffered, format=self.config.format)
-            buffered.seek(0)
-            base64_screenshot = base64.b64encode(buffered.getvalue()).decode('utf-8')
+            if self.config.mime_type == "image/jpeg":
+                # convert() always copies, so only call it for grabs that carry alpha or a palette
+                if screenshot.mode != 'RGB':
+                    screenshot = screenshot.convert('RGB')
+                screenshot.save(buffered, format='JPEG', quality=self.config.jpeg_quality,
+                                optimize=False, subsampling=2)
+            elif self.config.mime_type == "image/png":
+                # Fast deflate; the default level 6 costs several times more CPU for a slightly smaller file
+                screenshot.save(buffered, format='PNG', compress_level=self.config.png_compress_level)
+            else:
+                screenshot.save(buffered, format=self.config.format)
+            del screenshot
+            # getbuffer() exposes the encoded bytes without copying them
+            with buffered.getbuffer() as view:
+                base64_screenshot = b64encode_as_string(view)
+            buffered.close()
             
             logger.debug("Screenshot captured successfully")
             return base64_screenshot
@@ -96,8 +217,11 @@ class ScreenshotManager:
             logger.error(f"Error taking screenshot: {e}")
             return None
 
-    def set_callback(self, callback: Callable[[ScreenshotType], Any]) -> None:
-        """Set the callback for screenshot actions."""
+    def set_callback(self, callback: Callable[[ScreenshotType, str], Any]) -> None:
+        """Set the callback for screenshot actions.
+
+        The callback runs on the capture worker and receives the base64 screenshot.
+        """
         self.callback = callback
         self._setup_shortcuts()
         logger.debug("Screenshot callback set")
@@ -108,53 +232,66 @@ class ScreenshotManager:
             logger.warning("No callback set for shortcuts")
             return
 
-        # Stop existing listeners
-        for listener in self.hotkey_listeners.values():
-            listener.stop()
-        self.hotkey_listeners.clear()
+        # Stop the existing listener
+        self._stop_hotkeys()
+
+        try:
+            from pynput import keyboard
+        except Exception as e:
+            logger.error(f"Error setting up shortcuts: {e}")
+            return
 
-        # Setup new listeners
+        # Register every shortcut on one listener so only a single keyboard hook is installed
+        hotkey_map = {}
         for shortcut_name, shortcut_key in self.config.shortcuts.items():
             try:
                 screenshot_type = self._get_screenshot_type(shortcut_name)
                 if screenshot_type:
-                    self._setup_shortcut(shortcut_key, screenshot_type)
+                    # Validate here so one malformed shortcut does not disable the others
+                    keyboard.HotKey.parse(shortcut_key)
+                    hotkey_map[shortcut_key] = (
+                        lambda st=screenshot_type: self._handle_shortcut_sync(st)
+                    )
+                    logger.debug(f"Shortcut {shortcut_key} set up for {screenshot_type.name}")
             except Exception as e:
                 logger.error(f"Error setting up shortcut {shortcut_name}: {e}")
 
-    def _setup_shortcut(self, shortcut_key: str, screenshot_type: ScreenshotType) -> None:
-        """Setup a single keyboard shortcut."""
-        try:
-            def on_activate():
-                self._handle_shortcut_sync(screenshot_type)
+        if not hotkey_map:
+            return
 
-            hotkey = keyboard.GlobalHotKeys({shortcut_key: on_activate})
-            hotkey.start()
-            self.hotkey_listeners[shortcut_key] = hotkey
-            logger.debug(f"Shortcut {shortcut_key} set up for {screenshot_type.name}")
+        try:
+            self._hotkeys = keyboard.GlobalHotKeys(hotkey_map)
+            self._hotkeys.start()
         except Exception as e:
-            logger.error(f"Error setting up shortcut {shortcut_key}: {e}")
+            logger.error(f"Error starting shortcut listener: {e}")
+
+    def _stop_hotkeys(self) -> None:
+        """Stop the shared hotkey listener if one is running."""
+        if self._hotkeys:
+            self._hotkeys.stop()
+            self._hotkeys = None
 
     def _handle_shortcut_sync(self, screenshot_type: ScreenshotType) -> None:
         """Handle shortcut activation synchronously."""
         try:
             if self.callback:
-                # Create and start worker thread
-                worker = threading.Thread(
-                    target=self._screenshot_worker,
-                    args=(screenshot_type,),
-                    daemon=True
-                )
-                worker.start()
+                # Coalesce repeated presses while a capture of this type is still queued
+                with self._pending_lock:
+                    if screenshot_type in self._pending:
+                        return
+                    self._pending.add(screenshot_type)
+                self._executor.submit(self._screenshot_worker, screenshot_type)
         except Exception as e:
             logger.error(f"Error handling shortcut for {screenshot_type.name}: {e}")
 
     def _screenshot_worker(self, screenshot_type: ScreenshotType) -> None:
         """Worker thread for taking screenshots."""
+        with self._pending_lock:
+            self._pending.discard(screenshot_type)
         try:
             screenshot_data = self.take_screenshot(screenshot_type)
             if screenshot_data and self.callback:
-                self.callback(screenshot_type)
+                self.callback(screenshot_type, screenshot_data)
         except Exception as e:
             logger.error(f"Error in screenshot worker: {e}")
 
@@ -170,35 +307,25 @@ class ScreenshotManager:
 
     def save_shortcuts(self) -> None:
         """Save shortcuts configuration."""
-        config_file = self.config.config_dir / "screenshot_config.json"
-        temp_file = config_file.with_suffix('.tmp')
+        config_file = self.config.config_dir / CONFIG_FILENAME
         
         try:
-            # Write to temporary file first
-            with open(temp_file, 'w') as f:
-                json.dump({
-                    "shortcuts": self.config.shortcuts,
-                    "format": self.config.format
-                }, f, indent=2)
-            
-            # Atomically rename
-            temp_file.replace(config_file)
-            logger.debug("Shortcuts saved successfully")
+            # The capture format is not persisted so older files can't pin a stale one
+            if _write_config(config_file, {"shortcuts": self.config.shortcuts}):
+                logger.debug("Shortcuts saved successfully")
+            else:
+                logger.debug("Shortcuts unchanged, skipping save")
         except Exception as e:
             logger.error(f"Error saving shortcuts: {e}")
-            if temp_file.exists():
-                temp_file.unlink()
 
     def load_shortcuts(self) -> None:
         """Load shortcuts configuration."""
-        config_file = self.config.config_dir / "screenshot_config.json"
+        config_file = self.config.config_dir / CONFIG_FILENAME
         
         try:
-            if config_file.exists():
-                with open(config_file, 'r') as f:
-                    data = json.loads(f.read())
-                    self.config.shortcuts.update(data.get("shortcuts", {}))
-                    self.config.format = data.get("format", self.config.format)
+            data = _read_config(config_file)
+            if data:
+                self.config.shortcuts.update(data.get("shortcuts", {}))
                 logger.debug("Shortcuts loaded successfully")
         except Exception as e:
             logger.error(f"Error loading shortcuts: {e}")
@@ -206,9 +333,8 @@ class ScreenshotManager:
     def cleanup(self) -> None:
         """Cleanup resources."""
         try:
-            for listener in self.hotkey_listeners.values():
-                listener.stop()
-            self.hotkey_listeners.clear()
+            self._stop_hotkeys()
+            self._executor.shutdown(wait=False, cancel_futures=True)
             logger.debug("Screenshot manager cleaned up")
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
@@ -216,52 +342,23 @@ class ScreenshotManager:
 
 def load_shortcuts() -> Dict[str, str]:
     """Load shortcuts from config file."""
-    config_dir = Path.home() / ".clipbrd"
-    config_file = config_dir / "screenshot_config.json"
-    
-    default_shortcuts = {
-        "full_screenshot": "<ctrl>+<shift>+f",
-        "region_screenshot": "<ctrl>+<shift>+r",
-        "predefined_screenshot": "<ctrl>+<shift>+p",
-        "custom_screenshot": "<ctrl>+<shift>+l"
-    }
-    
     try:
-        if config_file.exists():
-            with open(config_file, 'r') as f:
-                data = json.loads(f.read())
-                shortcuts = data.get("shortcuts", {})
-                # Ensure all default shortcuts exist
-                for key, value in default_shortcuts.items():
-                    if key not in shortcuts:
-                        shortcuts[key] = value
-                return shortcuts
+        data = _read_config(_CONFIG_FILE)
+        if data:
+            # Ensure all default shortcuts exist
+            return {**DEFAULT_SHORTCUTS, **data.get("shortcuts", {})}
     except Exception as e:
         logger.error(f"Error loading shortcuts: {e}")
     
-    return default_shortcuts
+    return dict(DEFAULT_SHORTCUTS)
 
 def save_shortcuts(shortcuts: Dict[str, str]) -> None:
     """Save shortcuts to config file."""
-    config_dir = Path.home() / ".clipbrd"
-    config_file = config_dir / "screenshot_config.json"
-    temp_file = config_file.with_suffix('.tmp')
-    
     try:
-        config_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Write to temporary file first
-        with open(temp_file, 'w') as f:
-            json.dump({
-                "shortcuts": shortcuts,
-                "format": "PNG"
-            }, f, indent=2)
-        
-        # Atomically rename
-        temp_file.replace(config_file)
-        logger.debug("Shortcuts saved successfully")
+        if _write_config(_CONFIG_FILE, {"shortcuts": shortcuts}):
+            logger.debug("Shortcuts saved successfully")
+        else:
+            logger.debug("Shortcuts unchanged, skipping save")
     except Exception as e:
         logger.error(f"Error saving shortcuts: {e}")
-        if temp_file.exists():
-            temp_file.unlink()
     
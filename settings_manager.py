@@ -1,54 +1,163 @@
 import os
+import sys
 import json
+import atexit
 import logging
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from logging.handlers import RotatingFileHandler
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Any, Optional
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk
-from license_manager import LicenseManager
-from glob import glob
-import subprocess
-import platform
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from screenshot import load_shortcuts, save_shortcuts
 
+# tkinter is imported lazily at runtime; this is for the annotations only
+if TYPE_CHECKING:
+    import tkinter as tk
+
 logger = logging.getLogger(__name__)
 
+# Debug log viewer shows this many trailing lines, found by reading backwards in blocks of this size
+DEBUG_LOG_LINES = 50
+DEBUG_LOG_TAIL_BLOCK = 8192
+# Once appended output grows the viewer past the max, this many of its oldest lines are dropped at once
+DEBUG_LOG_MAX_LINES = 200
+DEBUG_LOG_TRIM_LINES = 50
+# Debug log viewer refresh interval in ms, doubled up to the max while the log is unchanged
+DEBUG_LOG_POLL_MS = 2000
+DEBUG_LOG_MAX_POLL_MS = 5000
+
+# debug.log is rotated at this size, keeping this many old files
+DEBUG_LOG_MAX_BYTES = 1_000_000
+DEBUG_LOG_BACKUPS = 3
+
+# Seconds a license verification result is reused when the settings dialog is reopened
+LICENSE_CACHE_TTL = 30
+
+# Delay used to coalesce update_setting writes
+SAVE_DEBOUNCE_SECONDS = 0.25
+
+# Settings window icon for this platform, resolved once at import
+_ICON_PATH = os.path.join(os.path.dirname(__file__), 'assets', 'icons',
+                          'clipbrd_windows.ico' if os.name == 'nt' else 'clipbrd_macos.png')
+_ICON_EXISTS = os.path.exists(_ICON_PATH)
+
+# Window icon PhotoImages per Tk root, then per icon_path; a PhotoImage only lives as long as
+# its root, so entries are weakly keyed on the root object and go away with it
+_ICON_CACHE: "weakref.WeakKeyDictionary[tk.Tk, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+def _get_icon_photo(icon_path: str, master: "tk.Misc"):
+    """Load the icon at icon_path as a PhotoImage bound to master's root, decoding it only once."""
+    photos = _ICON_CACHE.setdefault(master._root(), {})
+    photo = photos.get(icon_path)
+    if photo is None:
+        from PIL import Image, ImageTk
+        with Image.open(icon_path) as img:
+            photo = ImageTk.PhotoImage(img, master=master)
+        photos[icon_path] = photo
+    return photo
+
+def _tail_lines(path: str, n: int, end: int, block: int = DEBUG_LOG_TAIL_BLOCK) -> str:
+    """Return the last n lines of the first end bytes of path, reading backwards from end."""
+    with open(path, 'rb') as f:
+        pos = end
+        buf = b''
+        # n + 1 newlines guarantee n complete lines after the first one
+        while pos > 0 and buf.count(b'\n') <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = buf.decode('utf-8', 'replace').splitlines(keepends=True)
+    if pos > 0:
+        lines = lines[1:]  # Drop the line cut by the seek
+    return "".join(lines[-n:])
+
+def _watch_file(path: Path, on_change: Callable[[], None]):
+    """Call on_change (from a watchdog thread) whenever path is written.
+
+    Returns the started observer, or None when watchdog is not installed.
+    """
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class _Handler(FileSystemEventHandler):
+        def on_modified(self, event):
+            if not event.is_directory and Path(event.src_path) == path:
+                on_change()
+
+    # watchdog logs a DEBUG record per filesystem event; in debug mode those land in
+    # the watched debug.log and trigger more events, so keep them out of the root handlers
+    logging.getLogger('watchdog').setLevel(logging.WARNING)
+
+    observer = Observer()
+    observer.daemon = True
+    observer.schedule(_Handler(), str(path.parent), recursive=False)
+    observer.start()
+    return observer
+
+def _find_onedrive_documents(home: str) -> Optional[str]:
+    """Find a Documents/Documentos folder inside a OneDrive folder of the home directory.
+
+    Scans the home directory once and probes only OneDrive entries (which covers
+    localized names such as "OneDrive - Company"), preferring Documents over Documentos.
+    """
+    candidates = {"Documents": None, "Documentos": None}
+    try:
+        with os.scandir(home) as entries:
+            for entry in entries:
+                if "OneDrive" not in entry.name or not entry.is_dir(follow_symlinks=False):
+                    continue
+                for name in candidates:
+                    path = os.path.join(entry.path, name)
+                    if candidates[name] is None and os.path.isdir(path):
+                        candidates[name] = path
+                if candidates["Documents"]:
+                    break
+    except OSError as e:
+        logger.error(f"Error scanning home directory: {e}")
+    return candidates["Documents"] or candidates["Documentos"]
+
+# Documents folders to probe under the home directory, in order, for this platform only;
+# None marks where Windows scans OneDrive folders
+if sys.platform == 'win32':
+    _DOCUMENTS_CANDIDATES = ("Documents", None, "Documentos")
+elif sys.platform == 'darwin':
+    _DOCUMENTS_CANDIDATES = ("Documents", os.path.join("Library", "Documents"), "Documentos")
+else:
+    _DOCUMENTS_CANDIDATES = ("Documents", "Documentos")
+
+@lru_cache(maxsize=1)
 def get_default_documents_folder() -> str:
     """Get the default documents folder with fallbacks for different systems and languages."""
-    # Try standard Documents folder
-    documents_folder = os.path.expanduser("~/Documents")
-    if os.path.exists(documents_folder):
-        return os.path.join(documents_folder, "Clipbrd")
-    
-    # Try Windows with OneDrive
-    onedrive_docs = glob(os.path.expanduser("~\\*\\Documents"))
-    if onedrive_docs:
-        return os.path.join(onedrive_docs[0], "Clipbrd")
-    
-    # Try Spanish Windows with OneDrive
-    onedrive_docs_es = glob(os.path.expanduser("~\\*\\Documentos"))
-    if onedrive_docs_es:
-        return os.path.join(onedrive_docs_es[0], "Clipbrd")
-    
-    # Try macOS
-    macos_docs = os.path.expanduser("~/Library/Documents")
-    if os.path.exists(macos_docs):
-        return os.path.join(macos_docs, "Clipbrd")
-    
-    # Try Spanish language systems
-    spanish_docs = os.path.expanduser("~/Documentos")
-    if os.path.exists(spanish_docs):
-        return os.path.join(spanish_docs, "Clipbrd")
+    home = os.path.expanduser("~")
+    for candidate in _DOCUMENTS_CANDIDATES:
+        if candidate is None:
+            # Try Windows with OneDrive, including Spanish Windows
+            documents_folder = _find_onedrive_documents(home)
+        else:
+            documents_folder = os.path.join(home, candidate)
+            if not os.path.isdir(documents_folder):
+                documents_folder = None
+        if documents_folder:
+            return os.path.join(documents_folder, "Clipbrd")
     
     # Fallback to home directory
-    return os.path.join(os.path.expanduser("~"), "Clipbrd")
+    return os.path.join(home, "Clipbrd")
 
 def ensure_clipbrd_folder(path: str) -> str:
     """Ensure the path ends with Clipbrd and the folder exists."""
     if not path.endswith("Clipbrd"):
         path = os.path.join(path, "Clipbrd")
+    # One stat in the common case where the folder already exists
+    if os.path.isdir(path):
+        return path
     
     try:
         os.makedirs(path, exist_ok=True)
@@ -57,154 +166,360 @@ def ensure_clipbrd_folder(path: str) -> str:
     
     return path
 
+# Folder opener resolved once; Windows uses os.startfile instead of a command
+if os.name == 'nt':
+    _OPEN_CMD = None
+elif sys.platform == 'darwin':  # macOS
+    _OPEN_CMD = "open"
+else:  # Linux
+    _OPEN_CMD = "xdg-open"
+
 def open_folder_in_explorer(path: str):
     """Open the specified folder in the system's default file explorer."""
     try:
-        if platform.system() == "Windows":
+        if _OPEN_CMD is None:  # Windows
             os.startfile(path)
-        elif platform.system() == "Darwin":  # macOS
-            subprocess.run(["open", path])
-        else:  # Linux
-            subprocess.run(["xdg-open", path])
+        else:
+            import subprocess
+            # Fire and forget; the file manager has its own UI for errors
+            subprocess.Popen([_OPEN_CMD, path], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, start_new_session=True)
     except Exception as e:
         logger.error(f"Error opening folder: {e}")
         return False
     return True
 
-@dataclass
+@dataclass(slots=True)
 class AppSettings:
     """Application settings with defaults."""
     theme: str = "light"
     check_interval: float = 0.1
     debug_mode: bool = False
-    shortcuts: Dict[str, str] = None
+    # Backing store for the shortcuts property, persisted under the "shortcuts" key
+    _shortcuts: Optional[Dict[str, str]] = field(default=None, repr=False)
     auto_update: bool = True
     notification_sound: bool = True
     minimize_to_tray: bool = True
     startup_launch: bool = True
     max_debug_entries: int = 100
     language: str = "en"
-    documents_folder: str = get_default_documents_folder()
+    documents_folder: Optional[str] = None
     
     def __post_init__(self):
-        if self.shortcuts is None:
-            self.shortcuts = load_shortcuts()
+        # Probe the filesystem only when settings.json did not provide a folder
+        if self.documents_folder is None:
+            self.documents_folder = get_default_documents_folder()
 
     def save_shortcuts(self):
         """Save shortcuts to both settings and screenshot config."""
         save_shortcuts(self.shortcuts)
 
+    @property
+    def shortcuts(self) -> Dict[str, str]:
+        # Read the screenshot config only when shortcuts are first needed
+        if self._shortcuts is None:
+            self._shortcuts = load_shortcuts()
+        return self._shortcuts
+
+    @shortcuts.setter
+    def shortcuts(self, value: Optional[Dict[str, str]]) -> None:
+        self._shortcuts = value
+
+@lru_cache(maxsize=8)
+def _read_settings_json(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a settings file; keyed on its mtime and size so edits invalidate the cache."""
+    # json accepts UTF-8 bytes directly, skipping the text-mode decode layer
+    return json.loads(Path(path).read_bytes())
+
+# Log record format shared by the file and console handlers
+_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+_CONSOLE_HANDLER = logging.StreamHandler()
+_CONSOLE_HANDLER.setFormatter(_FORMATTER)
+
+@lru_cache(maxsize=4)
+def _get_file_handler(log_path: str) -> logging.FileHandler:
+    """Get the debug log handler for a path, opening the file only once per process."""
+    file_handler = RotatingFileHandler(log_path, maxBytes=DEBUG_LOG_MAX_BYTES,
+                                       backupCount=DEBUG_LOG_BACKUPS, encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(_FORMATTER)
+    return file_handler
+
+# Live managers whose debounced saves and executors are settled at exit; weak so atexit doesn't pin them
+_MANAGERS = weakref.WeakSet()
+
+@atexit.register
+def _shutdown_managers() -> None:
+    for manager in list(_MANAGERS):
+        manager._flush_pending_save()
+        manager._shutdown_executor()
+
+# (settings.json key, AppSettings field) pairs, in declaration order; private
+# backing fields are stored under their public name
+_SETTINGS_FIELDS = tuple((f.name.lstrip('_'), f.name) for f in fields(AppSettings))
+_SETTINGS_FIELD_BY_KEY = dict(_SETTINGS_FIELDS)
+
 class SettingsManager:
     def __init__(self, app_data_dir: Optional[str] = None):
         if app_data_dir is None:
             app_data_dir = self._get_default_app_dir()
         
         self.app_data_dir = Path(app_data_dir)
+        self.app_data_dir.mkdir(parents=True, exist_ok=True)
         self.settings_file = self.app_data_dir / "settings.json"
+        self.log_file = self.app_data_dir / "debug.log"
+        # String form for os.stat/open in the debug log refresh loop
+        self._log_path = str(self.log_file)
         self.settings = self._load_settings()
+        # True while in-memory settings have changes not yet written to disk
+        self._dirty = False
+        # Pending debounced save, and the locks guarding it and the file write
+        self._save_timer: Optional[threading.Timer] = None
+        self._pending_snapshot: Optional[Dict[str, Any]] = None
+        self._save_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        _MANAGERS.add(self)
         self.settings_window = None
+        # Hidden Tk root reused by every settings dialog, and the thread that owns it
+        self._tk_root = None
+        self._tk_thread = None
+        # LicenseManager and the (monotonic time, result) of its last verification
+        self._license_manager = None
+        self._license_cache = (0.0, None)
+        # Runs the dialog's blocking license calls off the Tk thread; created on first use
+        self._executor: Optional[ThreadPoolExecutor] = None
         self._setup_logger()
         
     def _setup_logger(self):
         """Setup logging based on debug mode setting."""
         # Setup root logger to capture all app logs
         root_logger = logging.getLogger()
+        self.logger = logging.getLogger(__name__)
+
+        # Handlers are shared per log path; a repeat setup only applies the level
+        file_handler = _get_file_handler(self._log_path)
+        if file_handler in root_logger.handlers:
+            self._update_logging_level()
+            return
+
         root_logger.setLevel(logging.DEBUG if self.settings.debug_mode else logging.INFO)
         
-        # Create logs directory if it doesn't exist
-        log_dir = self.app_data_dir
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Setup file handler
-        log_file = log_dir / "debug.log"
-        file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        
-        # Create formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        
-        # Remove any existing handlers and add the new one
+        # Remove any existing handlers and add the shared ones
         for handler in root_logger.handlers[:]:
             root_logger.removeHandler(handler)
+            if handler is not _CONSOLE_HANDLER:
+                handler.close()
         root_logger.addHandler(file_handler)
         
         # Setup console handler as well
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.DEBUG if self.settings.debug_mode else logging.INFO)
-        console_handler.setFormatter(formatter)
-        root_logger.addHandler(console_handler)
+        _CONSOLE_HANDLER.setLevel(logging.DEBUG if self.settings.debug_mode else logging.INFO)
+        root_logger.addHandler(_CONSOLE_HANDLER)
         
-        # Get our specific logger
-        self.logger = logging.getLogger(__name__)
         self.logger.debug("Settings manager initialized with debug mode: %s", self.settings.debug_mode)
 
     def _update_logging_level(self):
         """Update logging level when debug mode changes."""
         new_level = logging.DEBUG if self.settings.debug_mode else logging.INFO
+        root_logger = logging.getLogger()
+        root_logger.setLevel(new_level)
+        # The file handler always records DEBUG; only console output follows the setting
+        for handler in root_logger.handlers:
+            if not isinstance(handler, logging.FileHandler):
+                handler.setLevel(new_level)
         self.logger.setLevel(new_level)
         self.logger.debug("Logging level updated to: %s", "DEBUG" if self.settings.debug_mode else "INFO")
         
     def _get_default_app_dir(self) -> Path:
         """Get the default application data directory."""
         if os.name == 'nt':  # Windows
-            base_dir = Path(os.environ.get('APPDATA', os.path.expanduser('~')))
+            appdata = os.environ.get('APPDATA')
+            base_dir = Path(appdata) if appdata else Path(os.path.expanduser('~'))
         else:  # macOS and Linux
             base_dir = Path(os.path.expanduser('~')) / '.config'
         
-        app_dir = base_dir / 'Clipbrd'
-        app_dir.mkdir(parents=True, exist_ok=True)
-        return app_dir
+        return base_dir / 'Clipbrd'
 
     def _load_settings(self) -> AppSettings:
         """Load settings from file or create defaults."""
         try:
-            if self.settings_file.exists():
-                with open(self.settings_file, 'r') as f:
-                    data = json.load(f)
-                return AppSettings(**data)
+            st = os.stat(self.settings_file)
+            data = _read_settings_json(str(self.settings_file), st.st_mtime_ns, st.st_size)
+            # Copy nested dicts too so the cached parse is never mutated through the settings
+            return AppSettings(**{_SETTINGS_FIELD_BY_KEY.get(key, key): dict(value) if isinstance(value, dict) else value
+                                  for key, value in data.items()})
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.error(f"Error loading settings: {e}")
         
         return AppSettings()
 
     def save_settings(self) -> bool:
-        """Save current settings to file."""
+        """Save current settings to file, superseding any pending debounced save."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        # Callers such as the settings dialog may have changed debug_mode directly
+        self._update_logging_level()
+        return self._flush_settings(self._snapshot_settings())
+
+    def _schedule_save(self) -> None:
+        """Save settings after SAVE_DEBOUNCE_SECONDS, coalescing bursts of updates."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            # Captured on the caller's thread; the timer thread only writes it out
+            self._pending_snapshot = self._snapshot_settings()
+            self._save_timer = threading.Timer(SAVE_DEBOUNCE_SECONDS, self._flush_settings,
+                                               args=(self._pending_snapshot,))
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _flush_pending_save(self) -> None:
+        """Write a debounced save that has not fired yet; run at exit by _shutdown_managers."""
+        with self._save_lock:
+            pending = self._save_timer is not None and self._save_timer.is_alive()
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            snapshot = self._pending_snapshot
+            self._pending_snapshot = None
+        if pending and snapshot is not None:
+            self._flush_settings(snapshot)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the executor for the dialog's license calls, starting it on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='settings')
+        return self._executor
+
+    def _shutdown_executor(self) -> None:
+        """Stop the license call executor, if one was started; run at exit by _shutdown_managers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _snapshot_settings(self) -> Dict[str, Any]:
+        """Copy the settings fields into a dict that can be serialized on another thread."""
+        # Read the fields directly; asdict() would deep-copy every value
+        # Shortcuts that were never read are written as null and load lazily again next time
+        settings_dict = {}
+        for key, name in _SETTINGS_FIELDS:
+            value = getattr(self.settings, name)
+            settings_dict[key] = dict(value) if isinstance(value, dict) else value
+        return settings_dict
+
+    def _flush_settings(self, settings_dict: Dict[str, Any]) -> bool:
+        """Atomically write a settings snapshot to file."""
+        temp_file = self.settings_file.with_suffix('.tmp')
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(asdict(self.settings), f, indent=2)
-            self._update_logging_level()  # Update logging level after settings change
+            # Serialize up front: json.dump issues one write per encoded fragment
+            # Pretty-print only in debug mode, where the file is likely to be read by a person
+            if settings_dict['debug_mode']:
+                payload = json.dumps(settings_dict, indent=2).encode('utf-8')
+            else:
+                payload = json.dumps(settings_dict, separators=(',', ':')).encode('utf-8')
+            with self._write_lock:
+                # Write to temporary file first, then atomically rename
+                with open(temp_file, 'wb') as f:
+                    f.write(payload)
+                    # Make sure the data is on disk before the rename publishes it
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.settings_file)
+            self._dirty = False
             self.logger.debug("Settings saved successfully")
             return True
         except Exception as e:
             self.logger.error(f"Error saving settings: {e}")
+            if temp_file.exists():
+                temp_file.unlink()
             return False
 
-    def update_setting(self, key: str, value: Any) -> bool:
-        """Update a single setting."""
+    def update_setting(self, key: str, value: Any, flush: bool = True) -> bool:
+        """Update a single setting.
+
+        The write is debounced so a burst of updates costs a single write. With
+        flush=False the change is only kept in memory until commit() is called.
+        """
         try:
             if hasattr(self.settings, key):
                 old_value = getattr(self.settings, key)
+                if old_value == value:
+                    self.logger.debug(f"Setting '{key}' unchanged: {value}")
+                    return True
                 setattr(self.settings, key, value)
                 self.logger.debug(f"Setting '{key}' updated: {old_value} -> {value}")
-                success = self.save_settings()
                 if key == 'debug_mode':
                     self._update_logging_level()
-                return success
+                if not flush:
+                    self._dirty = True
+                    return True
+                self._schedule_save()
+                return True
             self.logger.warning(f"Attempted to update non-existent setting: {key}")
             return False
         except Exception as e:
             self.logger.error(f"Error updating setting {key}: {e}")
             return False
 
+    def commit(self) -> bool:
+        """Write settings changed with update_setting(..., flush=False)."""
+        if not self._dirty:
+            return True
+        return self.save_settings()
+
     def get_setting(self, key: str) -> Any:
         """Get a setting value."""
         value = getattr(self.settings, key, None)
         self.logger.debug(f"Retrieved setting '{key}': {value}")
         return value
 
+    def _get_license_manager(self):
+        """Get the LicenseManager, loading the licensing stack on first use."""
+        if self._license_manager is None:
+            from license_manager import LicenseManager
+            self._license_manager = LicenseManager()
+        return self._license_manager
+
+    def _verify_license(self) -> Dict[str, Any]:
+        """Verify the stored license, reusing a result younger than LICENSE_CACHE_TTL seconds."""
+        checked_at, result = self._license_cache
+        if result is None or time.monotonic() - checked_at >= LICENSE_CACHE_TTL:
+            result = self._get_license_manager().verify_license()
+            self._license_cache = (time.monotonic(), result)
+        return result
+
+    def _get_tk_root(self) -> "tk.Tk":
+        """Get the hidden Tk root shared by settings dialogs, creating it on first use.
+
+        Tk objects are bound to the thread that created them, so a call from a
+        different thread gets a fresh root.
+        """
+        import tkinter as tk
+
+        if self._tk_root is not None and self._tk_thread == threading.get_ident():
+            try:
+                self._tk_root.winfo_exists()
+                return self._tk_root
+            except tk.TclError:
+                pass
+        # Icons loaded for a previous root died with it; drop them now rather than when it is collected
+        if self._tk_root is not None:
+            _ICON_CACHE.pop(self._tk_root, None)
+        self._tk_root = tk.Tk()
+        self._tk_root.withdraw()
+        self._tk_thread = threading.get_ident()
+        return self._tk_root
+
     def show_dialog(self):
         """Show settings dialog with dynamic sizing."""
+        # Tk is only needed once the dialog is opened, so keep it out of startup
+        import tkinter as tk
+        from tkinter import ttk, messagebox, filedialog
+
         # If window already exists, just focus it
         if self.settings_window is not None:
             try:
@@ -214,30 +529,27 @@ class SettingsManager:
                 # Window was destroyed but reference remains
                 self.settings_window = None
 
-        # Create new window
-        self.settings_window = tk.Tk()
+        # Create new window on the shared hidden root instead of a new Tcl interpreter
+        self.settings_window = tk.Toplevel(self._get_tk_root())
         root = self.settings_window
         root.title("Clipbrd Settings")
         
         # Define on_closing function at the start
         def on_closing():
             self.settings_window = None
+            stop_log_watch()
             root.destroy()
             
         # Set window close handler
         root.protocol("WM_DELETE_WINDOW", on_closing)
         
         # Set window icon
-        icon_dir = os.path.join(os.path.dirname(__file__), 'assets', 'icons')
-        icon_path = os.path.join(icon_dir, 'clipbrd_windows.ico' if os.name == 'nt' else 'clipbrd_macos.png')
-        
-        if os.path.exists(icon_path):
+        if _ICON_EXISTS:
             try:
                 if os.name == 'nt':  # Windows
-                    root.iconbitmap(icon_path)
+                    root.iconbitmap(_ICON_PATH)
                 else:  # macOS/Linux
-                    img = Image.open(icon_path)
-                    photo = ImageTk.PhotoImage(img)
+                    photo = _get_icon_photo(_ICON_PATH, root.master)
                     root.iconphoto(True, photo)
                     root.tk.call('wm', 'iconphoto', root._w, photo)
             except Exception as e:
@@ -287,75 +599,106 @@ class SettingsManager:
         license_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 20))
 
         # License Status
-        license_manager = LicenseManager()
+        license_manager = self._get_license_manager()
 
-        def refresh_license_frame():
-            # Clear all widgets in license frame
-            for widget in license_frame.winfo_children():
-                widget.destroy()
+        def when_done(future, callback):
+            # Tk is not thread-safe, so poll the future from the Tk thread rather
+            # than touching widgets from a done-callback on the worker
+            if not future.done():
+                root.after(50, when_done, future, callback)
+            elif root.winfo_exists():
+                callback(future)
+
+        # The three license views are built once and swapped with grid/grid_remove
+        checking_view = ttk.Label(license_frame, text="Checking license...")
+
+        active_view = ttk.Frame(license_frame)
+        status_label = ttk.Label(active_view)
+        status_label.grid(row=0, column=0, sticky=tk.W)
 
-            def check_license():
-                # Get stored license info
+        form_view = ttk.Frame(license_frame)
+        ttk.Label(form_view, text="Enter License Key:").grid(row=0, column=0, sticky=tk.W)
+        license_entry = ttk.Entry(form_view, width=40)
+        license_entry.grid(row=1, column=0, pady=5)
+
+        # Bumped on every refresh so a verification that finishes late is ignored
+        license_check = 0
+
+        def show_license_view(view):
+            for other in (checking_view, active_view, form_view):
+                if other is not view:
+                    other.grid_remove()
+            view.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        def refresh_license_frame():
+            nonlocal license_check
+            license_check += 1
+            check = license_check
+            show_license_view(checking_view)
+
+            def stored_license_status():
+                # Reading the keyring can block too (e.g. on an unlock prompt),
+                # so it runs on the executor along with the verification
                 license_key, license_data = license_manager.get_stored_license()
-                
-                if license_key and license_data:
-                    result = license_manager.verify_license()
-                    if result['status'] == 'success':
-                        # Show active license status
-                        ttk.Label(license_frame, text=result['message']).grid(row=0, column=0, sticky=tk.W)
-                        ttk.Button(license_frame, text="Deactivate License", 
-                                command=handle_deactivation).grid(row=1, column=0, pady=10)
-                    else:
-                        show_activation_form()
+                if not (license_key and license_data):
+                    return None
+                return self._verify_license()
+
+            def show_verification(future):
+                if check != license_check:
+                    return  # The frame was refreshed while verifying
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error verifying license: {e}")
+                    result = {'status': 'error'}
+                if result is not None and result['status'] == 'success':
+                    # Show active license status
+                    status_label.configure(text=result['message'])
+                    show_license_view(active_view)
+                else:
+                    license_entry.delete(0, tk.END)
+                    activate_button.configure(state="normal", text="Activate License")
+                    show_license_view(form_view)
+
+            when_done(self._get_executor().submit(stored_license_status), show_verification)
+
+        def handle_activation():
+            key = license_entry.get().strip()
+            if not key:
+                messagebox.showerror("Error", "Please enter a license key")
+                return
+
+            activate_button.configure(state="disabled", text="Activating...")
+
+            def finish_activation(future):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    messagebox.showerror("Error", str(e))
                 else:
-                    show_activation_form()
-
-            def show_activation_form():
-                ttk.Label(license_frame, text="Enter License Key:").grid(row=0, column=0, sticky=tk.W)
-                license_entry = ttk.Entry(license_frame, width=40)
-                license_entry.grid(row=1, column=0, pady=5)
-                
-                def handle_activation():
-                    key = license_entry.get().strip()
-                    if not key:
-                        messagebox.showerror("Error", "Please enter a license key")
+                    if result['status'] == 'success':
+                        self._license_cache = (0.0, None)
+                        messagebox.showinfo("Success", result['message'])
+                        refresh_license_frame()
                         return
+                    messagebox.showerror("Error", result.get('message', 'Invalid license key'))
+                activate_button.configure(state="normal", text="Activate License")
+
+            # Run the network call off the Tk thread
+            when_done(self._get_executor().submit(license_manager.activate_license, key), finish_activation)
 
-                    try:
-                        activate_button.configure(state="disabled", text="Activating...")
-                        root.update()
-
-                        result = license_manager.activate_license(key)
-                        
-                        if result['status'] == 'success':
-                            messagebox.showinfo("Success", result['message'])
-                            refresh_license_frame()
-                        else:
-                            messagebox.showerror("Error", result.get('message', 'Invalid license key'))
-                            if activate_button.winfo_exists():
-                                activate_button.configure(state="normal", text="Activate License")
-                    except Exception as e:
-                        messagebox.showerror("Error", str(e))
-                        if activate_button.winfo_exists():
-                            activate_button.configure(state="normal", text="Activate License")
-                    finally:
-                        if root.winfo_exists():
-                            root.update()
-
-                activate_button = ttk.Button(license_frame, text="Activate License", command=handle_activation)
-                activate_button.grid(row=2, column=0, pady=5)
-
-            def handle_deactivation():
-                if messagebox.askyesno("Confirm Deactivation", "Are you sure you want to deactivate your license?"):
-                    license_manager.clear_stored_license()
-                    messagebox.showinfo("Success", "License deactivated successfully")
-                    refresh_license_frame()
-
-            # Start the license check
-            check_license()
-
-        # Initial license frame setup
-        refresh_license_frame()
+        def handle_deactivation():
+            if messagebox.askyesno("Confirm Deactivation", "Are you sure you want to deactivate your license?"):
+                license_manager.clear_stored_license()
+                self._license_cache = (0.0, None)
+                messagebox.showinfo("Success", "License deactivated successfully")
+                refresh_license_frame()
+
+        activate_button = ttk.Button(form_view, text="Activate License", command=handle_activation)
+        activate_button.grid(row=2, column=0, pady=5)
+        ttk.Button(active_view, text="Deactivate License",
+                   command=handle_deactivation).grid(row=1, column=0, pady=10)
 
         # Settings Frame
         settings_frame = ttk.LabelFrame(general_frame, text="Settings", padding="10")
@@ -368,8 +711,11 @@ class SettingsManager:
         
         def on_debug_toggle():
             debug_log.grid_remove() if not debug_var.get() else debug_log.grid()
+            if not debug_var.get():
+                stop_log_watch()
             if debug_var.get():
                 update_debug_log()
+                start_log_watch()
                 # Adjust window size when showing debug log
                 root.after(100, lambda: root.geometry(f"{window_width}x{window_height}"))
         
@@ -400,33 +746,104 @@ class SettingsManager:
         def clear_debug_log():
             debug_text.delete(1.0, tk.END)
             
+        # Byte offset of debug.log already shown, so refreshes only read what was appended
+        log_offset = None
+        # (st_mtime_ns, st_size) of debug.log at the last refresh
+        log_stat = None
+
         def update_debug_log():
+            """Refresh the viewer from debug.log; returns True if the log had changed."""
+            nonlocal log_offset, log_stat
             if not debug_var.get():
-                return
+                return False
             try:
-                # Get the log file path
-                log_file = self.app_data_dir / "debug.log"
-                if log_file.exists():
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        # Read last 50 lines
-                        lines = f.readlines()[-50:]
-                        debug_text.delete(1.0, tk.END)
-                        debug_text.insert(tk.END, "".join(lines))
-                        debug_text.see(tk.END)  # Scroll to bottom
+                # One stat serves the change, existence and size checks
+                log_file = self._log_path
+                try:
+                    st = os.stat(log_file)
+                except FileNotFoundError:
+                    return False
+                if (st.st_mtime_ns, st.st_size) == log_stat:
+                    return False
+                log_stat = (st.st_mtime_ns, st.st_size)
+                size = st.st_size
+                if size == log_offset:
+                    # Touched but nothing appended since the last refresh
+                    return True
+                if log_offset is None or size < log_offset:
+                    # First read, or the log was truncated: show its last 50 lines
+                    tail = _tail_lines(log_file, DEBUG_LOG_LINES, size)
+                    debug_text.delete(1.0, tk.END)
+                    debug_text.insert(tk.END, tail)
+                else:
+                    with open(log_file, 'rb') as f:
+                        f.seek(log_offset)
+                        debug_text.insert(tk.END, f.read(size - log_offset).decode('utf-8', 'replace'))
+                    # Keep the widget bounded, trimming from the top in batches
+                    # rather than re-laying out a few lines on every tick
+                    line_count = int(debug_text.index('end-1c').split('.')[0])
+                    if line_count > DEBUG_LOG_MAX_LINES:
+                        debug_text.delete(1.0, f"{line_count - DEBUG_LOG_MAX_LINES + DEBUG_LOG_TRIM_LINES}.0")
+                log_offset = size
+                debug_text.see(tk.END)  # Scroll to bottom only when new content arrived
+                return True
             except Exception as e:
                 debug_text.delete(1.0, tk.END)
                 debug_text.insert(tk.END, f"Error reading debug log: {str(e)}")
+                return False
         
         ttk.Button(button_frame, text="Clear", command=clear_debug_log).grid(row=0, column=0, padx=5)
         ttk.Button(button_frame, text="Refresh", command=update_debug_log).grid(row=0, column=1, padx=5)
         
-        # Auto-update debug log every 2 seconds if debug mode is on
-        def auto_update_debug():
+        # Auto-update debug log every 2 seconds if debug mode is on, backing off
+        # to 5 seconds while the log is not being written
+        poll_job = None
+
+        def auto_update_debug(delay=DEBUG_LOG_POLL_MS):
+            nonlocal poll_job
+            poll_job = None
+            if root.winfo_exists() and debug_var.get() and log_watch is None:
+                if update_debug_log():
+                    delay = DEBUG_LOG_POLL_MS
+                else:
+                    delay = min(delay * 2, DEBUG_LOG_MAX_POLL_MS)
+                poll_job = root.after(delay, auto_update_debug, delay)
+
+        # With watchdog installed and a thread-safe Tcl, refresh only when debug.log
+        # is written; otherwise keep polling
+        log_watch = None
+        refresh_queued = threading.Event()
+
+        def on_log_written():
+            # Coalesce bursts of writes into one refresh on the Tk thread
+            if not refresh_queued.is_set():
+                refresh_queued.set()
+                root.after(100, refresh_from_watch)
+
+        def refresh_from_watch():
+            refresh_queued.clear()
             if root.winfo_exists() and debug_var.get():
                 update_debug_log()
-                root.after(2000, auto_update_debug)
-        
-        auto_update_debug()
+
+        def start_log_watch():
+            nonlocal log_watch
+            if log_watch is not None:
+                return
+            if root.tk.getboolean(root.tk.call('info', 'exists', 'tcl_platform(threaded)')):
+                try:
+                    log_watch = _watch_file(self.log_file, on_log_written)
+                except Exception as e:
+                    logger.error(f"Error watching debug log: {str(e)}")
+            if log_watch is None:
+                if poll_job is not None:
+                    root.after_cancel(poll_job)
+                auto_update_debug()
+
+        def stop_log_watch():
+            nonlocal log_watch
+            if log_watch is not None:
+                log_watch.stop()
+                log_watch = None
 
         # Other settings continue below the debug section
         # Notification Sound
@@ -479,18 +896,25 @@ class SettingsManager:
 
         def save_settings():
             try:
-                self.settings.debug_mode = debug_var.get()
-                self.settings.notification_sound = notif_sound_var.get()
-                self.settings.minimize_to_tray = minimize_var.get()
-                self.settings.language = lang_var.get()
-                self.settings.documents_folder = folder_var.get()
-                
-                # Save screenshot shortcut
-                new_shortcuts = {"full_screenshot": shortcut_entry.get()}
-                self.settings.shortcuts = new_shortcuts
-                save_shortcuts(new_shortcuts)
-                
-                self.save_settings()
+                # Read every widget first so a failure leaves self.settings untouched
+                new_values = {
+                    'debug_mode': debug_var.get(),
+                    'notification_sound': notif_sound_var.get(),
+                    'minimize_to_tray': minimize_var.get(),
+                    'language': lang_var.get(),
+                    'documents_folder': folder_var.get(),
+                    'shortcuts': {"full_screenshot": shortcut_entry.get()},
+                }
+                changed = {key: value for key, value in new_values.items()
+                           if getattr(self.settings, key) != value}
+                if 'shortcuts' in changed:
+                    save_shortcuts(changed['shortcuts'])
+
+                for key, value in changed.items():
+                    setattr(self.settings, key, value)
+                # Nothing to write if every value matches what is already saved
+                if changed or self._dirty:
+                    self.save_settings()
                 messagebox.showinfo("Success", "Settings saved successfully!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save settings: {e}")
@@ -500,8 +924,20 @@ class SettingsManager:
         # Save Button
         ttk.Button(general_frame, text="Save", command=save_settings).grid(row=3, column=0, pady=20)
 
+        # Fill in the license status and debug log once the dialog has been drawn,
+        # so reading the stored license and the log tail does not delay the first paint
+        def populate():
+            if not root.winfo_exists():
+                return
+            refresh_license_frame()
+            if debug_var.get():
+                update_debug_log()
+                start_log_watch()
+
+        root.after_idle(populate)
+
         try:
-            root.mainloop()
+            root.wait_window()
         except Exception as e:
             logger.error(f"Error in settings dialog: {e}")
             self.settings_window = None
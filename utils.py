@@ -1,18 +1,92 @@
 import os
-import pypandoc 
 import sys
-from PIL import Image, ImageFont
-from pilmoji import Pilmoji
+import hashlib
+import logging
+import tempfile
+from functools import lru_cache
+from PIL import Image
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Rendered icons are kept here so later runs skip Pilmoji and its emoji downloads;
+# bump the version when the rendering below changes
+_ICON_CACHE_DIR = Path.home() / '.clipbrd' / 'icons'
+_ICON_CACHE_VERSION = 1
+_ICON_CACHE_MAX_FILES = 256
+
+@lru_cache(maxsize=1)
+def _get_emoji_source():
+    # Pilmoji's default source, created once so its HTTP session is shared by every render
+    from pilmoji.source import Twemoji
+    return Twemoji()
+
+@lru_cache(maxsize=8)
+def _load_font(font_path, font_size):
+    from PIL import ImageFont
+    return ImageFont.truetype(font_path, font_size)
+
 def create_text_image(text, width=72, height=72, background_color='black', text_color='white', font_path="arial.ttf", font_size=64):
+    # Icons repeat a handful of glyphs; hand out copies so callers can't alter the cached render
+    return _render_text_image(text, width, height, background_color, text_color, font_path, font_size).copy()
+
+@lru_cache(maxsize=64)
+def _render_text_image(text, width, height, background_color, text_color, font_path, font_size):
+    key = repr((_ICON_CACHE_VERSION, text, width, height, background_color, text_color, font_path, font_size))
+    cache_file = _ICON_CACHE_DIR / f"{hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()}.png"
+    try:
+        image = Image.open(cache_file)
+        image.load()
+        return image
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error(f"Error reading cached icon {cache_file}: {e}")
+
+    image = _draw_text_image(text, width, height, background_color, text_color, font_path, font_size)
+    try:
+        _ICON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Each writer gets its own temp file; the prewarm and icon-update threads can render the same icon
+        with tempfile.NamedTemporaryFile(dir=_ICON_CACHE_DIR, suffix='.tmp', delete=False) as temp:
+            temp_file = temp.name
+            try:
+                image.save(temp, 'PNG')
+            except Exception:
+                temp.close()
+                os.remove(temp_file)
+                raise
+        os.replace(temp_file, cache_file)
+        _prune_icon_cache()
+    except Exception as e:
+        logger.error(f"Error caching icon {cache_file}: {e}")
+    return image
+
+def _prune_icon_cache():
+    # Tray titles such as "Clipbrd: <answer>" vary, so keep only the most recently written icons
+    try:
+        entries = [entry for entry in os.scandir(_ICON_CACHE_DIR) if entry.is_file()]
+        if len(entries) <= _ICON_CACHE_MAX_FILES:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:-_ICON_CACHE_MAX_FILES]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+    except Exception as e:
+        logger.error(f"Error pruning icon cache {_ICON_CACHE_DIR}: {e}")
+
+def _draw_text_image(text, width, height, background_color, text_color, font_path, font_size):
+    # Only needed when an icon isn't in the disk cache yet
+    from pilmoji import Pilmoji
+
     # Create an image with specified background color
     image = Image.new('RGBA', (width, height), background_color)
 
     # Use a truetype font
-    font = ImageFont.truetype(font_path, font_size)
+    font = _load_font(font_path, font_size)
 
-    with Pilmoji(image) as pilmoji:
+    with Pilmoji(image, source=_get_emoji_source()) as pilmoji:
         # Calculate text width and height with pilmoji
         text_width, text_height = pilmoji.getsize(text, font)
 
@@ -34,6 +108,8 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 def download_pandoc():
+    import pypandoc
+
     # Check if Pandoc is already installed
     try:
         version = pypandoc.get_pandoc_version()